@@ -1,4 +1,5 @@
 import json
+import time
 from typing import Any, Dict, Optional, Tuple, cast
 
 import boto3
@@ -11,7 +12,14 @@ Retrieves a secret from AWS Secrets Manager and converts it into a structured
 tuple for downstream use.
 """
 
-DEFAULT_REGION = f"{pgcopy.config.region}"
+DEFAULT_REGION: str = pgcopy.config.region
+# Seconds a fetched secret string is reused before it is fetched again
+DEFAULT_SECRET_TTL = 300.0
+
+_SESSION: Optional[boto3.session.Session] = None
+_CLIENTS: Dict[str, Any] = {}
+# (secret name, region) -> (monotonic fetch time, secret string)
+_SECRET_CACHE: Dict[Tuple[str, str], Tuple[float, str]] = {}
 
 
 def _ensure_dict(
@@ -22,17 +30,42 @@ def _ensure_dict(
     return v
 
 
-def _retrieve_from_aws(
-    secret_name: str, region_name: str
-) -> Dict[str, Optional[Dict[str, Optional[Any]]]]:
+def _get_client(region_name: str) -> Any:
     """
-    Calls AWS Secrets Manager to fetch the raw secret JSON for the given
-    secret name and region, returning it as a decoded Python object.
+    Returns the Secrets Manager client for the given region, creating the
+    shared boto3 session and the client on first use.
     """
-    session = boto3.session.Session()
-    client = session.client(
-        service_name="secretsmanager", region_name=region_name
-    )
+    global _SESSION
+
+    client = _CLIENTS.get(region_name)
+    if client is None:
+        if _SESSION is None:
+            _SESSION = boto3.session.Session()
+        client = _SESSION.client(
+            service_name="secretsmanager", region_name=region_name
+        )
+        _CLIENTS[region_name] = client
+    return client
+
+
+def _fetch_secret_string(
+    secret_name: str, region_name: str, ttl: float = DEFAULT_SECRET_TTL
+) -> str:
+    """
+    Calls AWS Secrets Manager to fetch the raw secret string for the given
+    secret name and region.
+
+    Results are cached per (secret name, region) for ttl seconds, so
+    repeated lookups during a run do not hit the Secrets Manager API again,
+    while a rotated password is picked up by warm Lambda invocations once
+    the entry expires. Failed lookups are not cached.
+    """
+    key = (secret_name, region_name)
+    cached = _SECRET_CACHE.get(key)
+    if cached is not None and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    client = _get_client(region_name)
 
     try:
         get_secret_value_response = client.get_secret_value(
@@ -43,7 +76,22 @@ def _retrieve_from_aws(
         # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
         raise e
 
-    secret = json.loads(get_secret_value_response["SecretString"])
+    secret = cast(str, get_secret_value_response["SecretString"])
+    _SECRET_CACHE[key] = (time.monotonic(), secret)
+    return secret
+
+
+def _retrieve_from_aws(
+    secret_name: str, region_name: str
+) -> Dict[str, Optional[Dict[str, Optional[Any]]]]:
+    """
+    Fetches the raw secret JSON for the given secret name and region,
+    returning it as a decoded Python object.
+
+    The secret string is served from an in-process cache; it is decoded on
+    every call so callers never share a mutable object.
+    """
+    secret = json.loads(_fetch_secret_string(secret_name, region_name))
     return cast(Dict[str, Optional[Dict[str, Optional[Any]]]], secret)
 
 
@@ -77,11 +125,12 @@ def format_secret(
     Extracts selected fields from the secret JSON and returns them in a
     fixed-order tuple.
     """
+    data = _ensure_dict(secret)
     return (
-        _ensure_dict(secret).get("host"),
-        _ensure_dict(secret).get("port"),
-        _ensure_dict(secret).get("username"),
-        _ensure_dict(secret).get("password"),
-        _ensure_dict(secret).get("dbInstanceIdentifier"),
-        _ensure_dict(secret).get("ssh"),
+        data.get("host"),
+        data.get("port"),
+        data.get("username"),
+        data.get("password"),
+        data.get("dbInstanceIdentifier"),
+        data.get("ssh"),
     )
@@ -3,6 +3,8 @@ ssh_user = "ec2-user"
 ssh_fingerprint = ""
 region = "ap-southeast-2"
 source_schema = "snapshot"
+direct_copy = False
+max_workers = 8
 target_env = "dev"
 db_prefix = "db"
 sm_prefix = "company/database/"
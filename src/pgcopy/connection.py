@@ -1,10 +1,13 @@
 import base64
+import binascii
+import functools
 import hashlib
+import hmac
 import io
-import select
+import selectors
 import socket
 import threading
-from typing import NoReturn, Tuple, cast
+from typing import Callable, Dict, Optional, Tuple, cast
 
 import paramiko
 import psycopg2
@@ -21,6 +24,30 @@ DEFAULT_HOST = "localhost"
 DEFAULT_DATABASE_NAME = "postgres"
 DEFAULT_DATABASE_USER = "postgres"
 DEFAULT_PORT = 5432
+DEFAULT_BUFFER_SIZE = 65536
+
+# Selector used by the tunnel relay; epoll on Linux. Tests replace it.
+_SELECTOR_FACTORY: Callable[[], selectors.BaseSelector] = (
+    selectors.DefaultSelector
+)
+
+# Connected SSH clients keyed by (ssh_host, ssh_user), and the listening
+# sockets of their tunnels keyed by (pool key, remote_host, remote_port).
+_SSH_POOL: Dict[Tuple[str, str], paramiko.SSHClient] = {}
+_TUNNELS: Dict[Tuple[Tuple[str, str], str, int], socket.socket] = {}
+_SSH_POOL_LOCK = threading.Lock()
+
+
+def _listen(local_host: str, local_port: int) -> socket.socket:
+    """
+    Creates a listening TCP socket on (local_host, local_port). Port 0 lets
+    the operating system pick a free port.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((local_host, local_port))
+    sock.listen(100)
+    return sock
 
 
 def _forward_tunnel(
@@ -29,7 +56,8 @@ def _forward_tunnel(
     transport: paramiko.transport.Transport,
     local_host: str = DEFAULT_HOST,
     local_port: int = DEFAULT_PORT,
-) -> NoReturn:
+    sock: Optional[socket.socket] = None,
+) -> None:
     """
     Establishes a local TCP listener and forwards all traffic through an SSH
     transport as a direct-tcpip channel to the specified remote host and port.
@@ -42,19 +70,22 @@ def _forward_tunnel(
         local_host (str): Local bind address for the forwarder. Defaults to \
         "localhost".
         local_port (int): Local port to listen on. Defaults to 5432.
+        sock (socket.socket): Already listening socket to accept on instead \
+        of binding (local_host, local_port). Optional.
 
     Behaviour:
-        - Creates a listening socket on (local_host, local_port).
+        - Creates a listening socket on (local_host, local_port) unless one
+          is passed in.
         - For each incoming client connection, opens an SSH channel of type
           "direct-tcpip" to (remote_host, remote_port).
         - Relays data bidirectionally between the local client socket and the
-          SSH channel until either side closes the connection.
+          SSH channel until either side closes the connection. Every chunk
+          is sent in full (sendall), even when a send is partial.
         - Handles each client connection in a separate daemon thread.
+        - Returns once the listening socket is closed.
     """
-    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    sock.bind((local_host, local_port))
-    sock.listen(100)
+    if sock is None:
+        sock = _listen(local_host, local_port)
 
     def handler(client_sock: socket.socket) -> None:
         chan = transport.open_channel(
@@ -66,29 +97,114 @@ def _forward_tunnel(
             print("Could not open SSH tunnel")
             return
 
-        while True:
-            r, _, _ = select.select([client_sock, chan], [], [])
-            if client_sock in r:
-                data = client_sock.recv(1024)
-                if len(data) == 0:
-                    break
-                chan.send(data)
-            if chan in r:
-                data = chan.recv(1024)
-                if len(data) == 0:
-                    break
-                client_sock.send(data)
-
-        chan.close()
-        client_sock.close()
+        sel = _SELECTOR_FACTORY()
+        sel.register(client_sock, selectors.EVENT_READ, "client")
+        sel.register(chan, selectors.EVENT_READ, "chan")
+
+        # Client reads land in one preallocated buffer instead of a new
+        # bytes object per recv
+        buf = bytearray(DEFAULT_BUFFER_SIZE)
+        view = memoryview(buf)
+
+        try:
+            relaying = True
+            while relaying:
+                for key, _ in sel.select():
+                    if key.data == "client":
+                        n = client_sock.recv_into(buf)
+                        if n == 0:
+                            relaying = False
+                            break
+                        # paramiko accepts any buffer; its stubs only name
+                        # bytes
+                        chan.sendall(view[:n])  # type: ignore[arg-type]
+                    else:
+                        data = chan.recv(DEFAULT_BUFFER_SIZE)
+                        if len(data) == 0:
+                            relaying = False
+                            break
+                        client_sock.sendall(data)
+        finally:
+            sel.close()
+            chan.close()
+            client_sock.close()
 
     while True:
-        client_sock, _ = sock.accept()
+        try:
+            client_sock, _ = sock.accept()
+        except OSError:
+            # Listener closed, e.g. by close_ssh_pool()
+            return
         threading.Thread(
             target=handler, args=(client_sock,), daemon=True
         ).start()
 
 
+@functools.lru_cache(maxsize=8)
+def _fingerprint_digest(fingerprint: str) -> Optional[bytes]:
+    """
+    Decodes an unpadded base64 SHA256 fingerprint into the raw digest.
+    Returns None if the fingerprint is not strictly valid base64.
+    """
+    try:
+        return base64.b64decode(
+            fingerprint + "=" * (-len(fingerprint) % 4), validate=True
+        )
+    except binascii.Error:
+        return None
+
+
+@functools.lru_cache(maxsize=64)
+def _verify_fingerprint(server_key: bytes, expected_fingerprint: str) -> bool:
+    """
+    Checks a server key against an expected fingerprint in constant time.
+    Results are cached per (key, fingerprint), so reconnecting to a known
+    host skips the SHA256. A fingerprint that is not valid base64 (e.g.
+    with the "SHA256:" prefix ssh-keygen prints) never matches.
+    """
+    expected_digest = _fingerprint_digest(expected_fingerprint)
+    if expected_digest is None:
+        return False
+    digest = hashlib.sha256(server_key).digest()
+    return hmac.compare_digest(digest, expected_digest)
+
+
+def _is_active(client: paramiko.SSHClient) -> bool:
+    transport: Optional[paramiko.transport.Transport] = client.get_transport()
+    return transport is not None and transport.is_active()
+
+
+def _open_ssh_client(
+    ssh_host: str,
+    ssh_user: str,
+    ssh_key: str,
+    expected_fingerprint: str,
+) -> paramiko.SSHClient:
+    """
+    Connects to the SSH bastion with an in-memory private key and verifies
+    the server key fingerprint. Raises ValueError on a mismatch.
+    """
+    client = paramiko.SSHClient()
+    client.load_system_host_keys()
+    client.set_missing_host_key_policy(paramiko.RejectPolicy())
+    # client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+    key_stream = io.StringIO(ssh_key)
+    private_key = paramiko.RSAKey.from_private_key(key_stream)
+    client.connect(ssh_host, username=ssh_user, pkey=private_key)
+
+    server_key = cast(
+        paramiko.transport.Transport, client.get_transport()
+    ).get_remote_server_key()
+
+    if not _verify_fingerprint(server_key.asbytes(), expected_fingerprint):
+        client.close()
+        digest = hashlib.sha256(server_key.asbytes()).digest()
+        fingerprint = base64.b64encode(digest).rstrip(b"=").decode("ascii")
+        raise ValueError(f"Unexpected SSH host key fingerprint: {fingerprint}")
+
+    return client
+
+
 def create_pg_connection(
     ssh_host: str,
     ssh_user: str,
@@ -111,6 +227,12 @@ def create_pg_connection(
     * starts a TCP listener that forwards to the remote PostgreSQL instance,
     * returns both the psycopg2 connection and the underlying SSH client.
 
+    SSH clients are pooled per (ssh_host, ssh_user). While a pooled client's
+    transport is active, it is reused, skipping the SSH handshake and
+    fingerprint check. Each client keeps one tunnel per remote host and
+    port; later connections to the same remote reuse that tunnel. Use
+    close_ssh_pool() to shut them down.
+
     Parameters
     ----------
     ssh_host : str
@@ -134,7 +256,8 @@ def create_pg_connection(
     local_host : str, optional
         Local bind address for the tunnel, default is 'localhost'.
     local_port : int, optional
-        Local bind port for the tunnel, default is 5432.
+        Local bind port for the tunnel, default is 5432. Use 0 to let the
+        operating system pick a free port.
 
     Returns
     -------
@@ -142,39 +265,45 @@ def create_pg_connection(
         (psycopg2 connection, paramiko.SSHClient)
     """
 
-    client = paramiko.SSHClient()
-    client.load_system_host_keys()
-    client.set_missing_host_key_policy(paramiko.RejectPolicy())
-    # client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
-    key_stream = io.StringIO(ssh_key)
-    private_key = paramiko.RSAKey.from_private_key(key_stream)
-    client.connect(ssh_host, username=ssh_user, pkey=private_key)
-
-    server_key = cast(
-        paramiko.transport.Transport, client.get_transport()
-    ).get_remote_server_key()
-
-    # fingerprint = hashlib.sha256(server_key.asbytes()).hexdigest()
-    digest = hashlib.sha256(server_key.asbytes()).digest()
-    fingerprint = base64.b64encode(digest).rstrip(b"=").decode("ascii")
+    key = (ssh_host, ssh_user)
+    with _SSH_POOL_LOCK:
+        client = _SSH_POOL.get(key)
+        if client is None or not _is_active(client):
+            if client is not None:
+                _evict(key)
+            client = _open_ssh_client(
+                ssh_host, ssh_user, ssh_key, expected_fingerprint
+            )
+            _SSH_POOL[key] = client
 
-    if fingerprint != expected_fingerprint:
-        client.close()
-        raise ValueError(f"Unexpected SSH host key fingerprint: {fingerprint}")
+        listener = _TUNNELS.get((key, remote_host, remote_port))
+        if listener is None:
+            listener = _listen(local_host, local_port)
+            _TUNNELS[(key, remote_host, remote_port)] = listener
 
-    transport = client.get_transport()
+            threading.Thread(
+                target=_forward_tunnel,
+                args=(
+                    remote_host,
+                    remote_port,
+                    client.get_transport(),
+                    local_host,
+                    local_port,
+                    listener,
+                ),
+                daemon=True,
+            ).start()
 
-    threading.Thread(
-        target=_forward_tunnel,
-        args=(remote_host, remote_port, transport, local_host, local_port),
-        daemon=True,
-    ).start()
+            print(
+                "SSH Tunnel running on "
+                f"{local_host}:{listener.getsockname()[1]}"
+            )
 
-    print(f"SSH Tunnel running on {local_host}:{local_port}")
+        tunnel_host, tunnel_port = listener.getsockname()[:2]
 
     conn = psycopg2.connect(
-        host=local_host,
-        port=local_port,
+        host=tunnel_host,
+        port=tunnel_port,
         dbname=db_name,
         user=db_user,
         password=db_password,
@@ -182,3 +311,38 @@ def create_pg_connection(
     )
 
     return conn, client
+
+
+def _close_listener(listener: socket.socket) -> None:
+    """
+    Closes a tunnel listener and wakes its forwarder. close() alone does
+    not interrupt a thread blocked in accept() on Linux; shutdown() makes
+    that accept() fail, so the forwarder returns and the port is freed.
+    """
+    try:
+        listener.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        # Not supported for listening sockets on every platform
+        pass
+    listener.close()
+
+
+def _evict(key: Tuple[str, str]) -> None:
+    """
+    Closes a pooled SSH client and the listeners of its tunnels, which
+    stops their forwarder threads. The caller must hold _SSH_POOL_LOCK.
+    """
+    for tunnel_key in [t for t in _TUNNELS if t[0] == key]:
+        _close_listener(_TUNNELS.pop(tunnel_key))
+    _SSH_POOL.pop(key).close()
+
+
+def close_ssh_pool() -> None:
+    """
+    Closes all pooled SSH clients and their tunnels. Intended for explicit
+    shutdown; regular runs keep the clients open so later connections can
+    reuse them.
+    """
+    with _SSH_POOL_LOCK:
+        for key in list(_SSH_POOL):
+            _evict(key)
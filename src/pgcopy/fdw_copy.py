@@ -1,17 +1,52 @@
+import itertools
 import json
 import logging
-from typing import Any, List, Optional, Sequence, Tuple
+import tempfile
+import uuid
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 import psycopg2
 from psycopg2 import sql
-from psycopg2.extensions import adapt
+from psycopg2.extras import Json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speed-up
+    orjson = None  # type: ignore[assignment]
 
 DEFAULT_USER = "postgres"
 DEFAULT_PORT = 5432
 DEFAULT_BATCH_SIZE = 1000
 DEFAULT_SERVER = "localhost"
+DEFAULT_SPOOL_SIZE = 64 * 1024 * 1024
+DEFAULT_COPY_BUFFER_SIZE = 65536
 CASCADE = True
 
+# Column names and exact SQL type text (format_type) of a table, in
+# attribute order
+_COLS_AND_TYPES_SQL = """
+            SELECT a.attname AS column_name,
+                   format_type(a.atttypid, a.atttypmod) AS column_type
+            FROM pg_attribute a
+            JOIN pg_class c ON a.attrelid = c.oid
+            JOIN pg_namespace n ON n.oid = c.relnamespace
+            WHERE n.nspname = {schema}
+              AND c.relname  = {table}
+              AND a.attgenerated = ''
+              AND a.attnum > 0
+              AND NOT a.attisdropped
+            ORDER BY a.attnum;
+        """
+
 
 def _get_remote_cols_and_types(
     conn: psycopg2.extensions.connection,
@@ -26,21 +61,7 @@ def _get_remote_cols_and_types(
     with conn.cursor() as cur:
         # Define a remote query that returns column name and exact SQL type
         # text (format_type)
-        remote_q = sql.SQL(
-            """
-            SELECT a.attname AS column_name,
-                   format_type(a.atttypid, a.atttypmod) AS column_type
-            FROM pg_attribute a
-            JOIN pg_class c ON a.attrelid = c.oid
-            JOIN pg_namespace n ON n.oid = c.relnamespace
-            WHERE n.nspname = {schema}
-              AND c.relname  = {table}
-              AND a.attgenerated = ''
-              AND a.attnum > 0
-              AND NOT a.attisdropped
-            ORDER BY a.attnum;
-        """
-        ).format(
+        remote_q = sql.SQL(_COLS_AND_TYPES_SQL).format(
             schema=sql.Literal(remote_schema), table=sql.Literal(remote_table)
         )
 
@@ -65,17 +86,80 @@ def _get_remote_cols_and_types(
         return rows  # list of (name, type_text)
 
 
-def _get_local_rows(
+def _get_cols_and_types(
+    conn: psycopg2.extensions.connection,
+    schema: str,
+    table: str,
+) -> List[Tuple[str, str]]:
+    """
+    Returns a list of (column_name, column_type) pairs for a table on the
+    server the connection points to.
+    """
+    with conn.cursor() as cur:
+        cur.execute(
+            sql.SQL(_COLS_AND_TYPES_SQL).format(
+                schema=sql.Literal(schema), table=sql.Literal(table)
+            )
+        )
+        rows = cur.fetchall()
+        if not rows:
+            raise ValueError(
+                f"Table {schema}.{table} not found or has no columns."
+            )
+        return rows
+
+
+def _get_local_col_names(
     conn: psycopg2.extensions.connection,
     local_schema: str,
     local_table: str,
     col_names: Sequence[str],
-    limit: Optional[int],
-) -> List[Tuple[Any, ...]]:
+) -> Set[str]:
     """
-    Retrieves local rows for the given set of column names.
+    Returns the subset of col_names that exist on a local table. The
+    filtering happens server-side, so only matching names are returned.
     """
     with conn.cursor() as cur:
+        cur.execute(
+            sql.SQL(
+                """
+                SELECT a.attname
+                FROM pg_attribute a
+                JOIN pg_class c ON a.attrelid = c.oid
+                JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE n.nspname = %s
+                  AND c.relname = %s
+                  AND a.attnum > 0
+                  AND NOT a.attisdropped
+                  AND a.attname = ANY(%s)
+            """
+            ),
+            (local_schema, local_table, list(col_names)),
+        )
+        return {r[0] for r in cur.fetchall()}
+
+
+def _iter_local_rows(
+    conn: psycopg2.extensions.connection,
+    local_schema: str,
+    local_table: str,
+    col_names: Sequence[str],
+    limit: Optional[int],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[List[Tuple[Any, ...]]]:
+    """
+    Streams local rows for the given set of column names in batches of at
+    most batch_size rows.
+
+    Rows are read through a server-side cursor, one batch per round trip,
+    so memory stays bounded regardless of the table size and the first
+    batch is available before the whole result is read. The cursor lives
+    in the caller's transaction: it must not be committed or rolled back
+    while batches are consumed (use savepoints instead). Its name is
+    unique, so it cannot collide with another cursor on the connection.
+    """
+    with conn.cursor(name=f"pgcopy_{uuid.uuid4().hex}") as cur:
+        cur.itersize = batch_size
         cols_sql = sql.SQL(", ").join(sql.Identifier(c) for c in col_names)
         q = sql.SQL("SELECT {cols} FROM {sch}.{tbl}").format(
             cols=cols_sql,
@@ -85,42 +169,92 @@ def _get_local_rows(
         if limit is not None:
             q = q + sql.SQL(" LIMIT {}").format(sql.Literal(limit))
         cur.execute(q)
-        return cur.fetchall()
-
-
-def _literal(v: Any, rtype: Optional[str] = None) -> str:
-    if v is None:
-        return "NULL"
-
-    if isinstance(v, list) and rtype and "[]" in rtype:
-        escaped_items = []
-        for x in v:
-            if x is None:
-                escaped_items.append("NULL")
-            else:
-                escaped_items.append(
-                    str(x).replace('"', '\\"').replace("'", "''")
-                )
-        return "'{" + ",".join(escaped_items) + "}'"
-
-    if isinstance(v, (dict, list)) or (
-        rtype and rtype.lower() in ("json", "jsonb")
-    ):
-        v = json.dumps(v, ensure_ascii=False)
-
-    codecs = ("utf-8", "latin-1", "windows-1254", "iso-8859-9")
-    for enc in codecs:
-        if isinstance(v, bytes):
-            try:
-                v = v.decode(enc)
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
                 break
-            except (UnicodeDecodeError, LookupError):
-                continue
+            yield rows
+
+
+def _get_local_rows(
+    conn: psycopg2.extensions.connection,
+    local_schema: str,
+    local_table: str,
+    col_names: Sequence[str],
+    limit: Optional[int],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> List[Tuple[Any, ...]]:
+    """
+    Returns all local rows for the given set of column names as a list.
+    """
+    return list(
+        itertools.chain.from_iterable(
+            _iter_local_rows(
+                conn, local_schema, local_table, col_names, limit, batch_size
+            )
+        )
+    )
 
+
+def _decode_bytes(v: bytes) -> str:
+    # latin-1 maps every byte, so it is a fallback that cannot fail. Valid
+    # UTF-8 takes the first branch without raising; only non-UTF-8 cells
+    # pay for the exception. errors="replace" would store U+FFFD instead
+    # of the original characters, and errors="surrogateescape" yields lone
+    # surrogates that cannot be encoded when the statement is sent.
     try:
-        return str(adapt(v).getquoted().decode("utf-8"))
-    except Exception:
-        return str("'" + v.replace("'", "''") + "'")
+        return v.decode("utf-8")
+    except UnicodeDecodeError:
+        return v.decode("latin-1")
+
+
+def _dump_json(v: Any) -> str:
+    if orjson is not None:
+        try:
+            return orjson.dumps(v, option=orjson.OPT_NON_STR_KEYS).decode(
+                "utf-8"
+            )
+        except TypeError:
+            # e.g. integers beyond 64 bit, which the json module handles
+            pass
+    return json.dumps(v, ensure_ascii=False)
+
+
+def _adapt_json(v: Any) -> Any:
+    return None if v is None else Json(v, dumps=_dump_json)
+
+
+def _adapt_value(v: Any) -> Any:
+    if isinstance(v, (dict, list)):
+        return Json(v, dumps=_dump_json)
+    if isinstance(v, bytes):
+        return _decode_bytes(v)
+    return v
+
+
+def _adapt_array_value(v: Any) -> Any:
+    # Nested lists are the dimensions of a multi-dimensional array; every
+    # element is adapted like a scalar cell
+    if isinstance(v, list):
+        return [_adapt_array_value(x) for x in v]
+    return _adapt_value(v)
+
+
+def _make_adapter(rtype: str) -> Callable[[Any], Any]:
+    """
+    Returns a converter that turns a cell of a column with the given remote
+    type into a value psycopg2 can adapt: lists for array columns become
+    ARRAY[...] of adapted elements, dicts, lists and JSON columns are
+    serialised as JSON, bytes are decoded.
+
+    The type only depends on the column, so the dispatch happens once per
+    column instead of once per cell.
+    """
+    if "[]" in rtype:
+        return _adapt_array_value
+    if rtype.lower() in ("json", "jsonb"):
+        return _adapt_json
+    return _adapt_value
 
 
 def copy_local_to_remote_via_dblink_values(
@@ -145,9 +279,9 @@ def copy_local_to_remote_via_dblink_values(
 
     * gets remote column names and types via dblink,
     * determines the intersection of local and remote columns,
-    * fetches local rows in the remote column order,
+    * streams local rows in the remote column order,
     * builds batched INSERT .. VALUES statements with explicit casts,
-    * executes them via dblink_exec inside a transaction per batch.
+    * executes them via dblink_exec, which commits each batch remotely.
 
     Returns
     -------
@@ -168,26 +302,16 @@ def copy_local_to_remote_via_dblink_values(
     remote_cols = _get_remote_cols_and_types(
         conn, remote_server, remote_schema, remote_table
     )
-    remote_col_names = [name for name, _ in remote_cols]
-    remote_type_texts = {name: typ for name, typ in remote_cols}
+    remote_type_texts = dict(remote_cols)
+    remote_col_names = list(remote_type_texts)
 
     # 2) Fetch local rows only for overlapping columns (by name),
     #    in remote order
     #    If schemas differ, still insert only columns that exist
     #    on both sides.
-    with conn.cursor() as cur:
-        # Determine local columns by querying information_schema
-        cur.execute(
-            sql.SQL(
-                """
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_schema = %s AND table_name = %s
-            """
-            ),
-            (local_schema, local_table),
-        )
-        local_cols = {r[0] for r in cur.fetchall()}
+    local_cols = _get_local_col_names(
+        conn, local_schema, local_table, remote_col_names
+    )
 
     common_cols = [c for c in remote_col_names if c in local_cols]
     if not common_cols:
@@ -195,80 +319,202 @@ def copy_local_to_remote_via_dblink_values(
             "No overlapping columns between local and remote \
                          tables."
         )
-    column_identifiers = [sql.Identifier(col) for col in common_cols]
+    columns_sql = sql.SQL(", ").join(sql.Identifier(c) for c in common_cols)
 
     # 3) Pull local data in the remote column order
     #    (subset = common columns)
-    rows = _get_local_rows(
-        conn, local_schema, local_table, common_cols, limit=row_limit
+    chunks = _iter_local_rows(
+        conn,
+        local_schema,
+        local_table,
+        common_cols,
+        limit=row_limit,
+        batch_size=batch_size,
     )
 
-    if not rows:
-        logging.warning("No rows to copy.")
-        return False
-
     # 4) Chunked multi-VALUES INSERT strings with explicit casts
     #    Example value per cell:  'abc'::text,
     #    '2025-10-07T01:23:45+10'::timestamp with time zone, 'ACTIVE'::my_enum
-    def build_insert_values_chunk(chunk: list[tuple[Any, ...]]) -> str:
-        value_rows = []
-        for r in chunk:
-            parts = []
-            for col_name, cell in zip(common_cols, r):
-                rtype = remote_type_texts[col_name]
-                lit = _literal(cell, rtype)
-                # Cast every literal to the remote declared type
-                # (NULL::type is valid too)
-                if lit == "NULL":
-                    parts.append(f"NULL::{rtype}")
-                else:
-                    parts.append(f"{lit}::{rtype}")
-            value_rows.append("(" + ", ".join(parts) + ")")
-
-        return ", ".join(value_rows)
-
-    # 5) Execute per-batch on the remote via dblink_exec
-    rows_copied = 0
-    for i in range(0, len(rows), batch_size):
-        chunk = rows[i : i + batch_size]
-        values_sql = build_insert_values_chunk(chunk)
-        insert_stmt = sql.SQL(
-            """INSERT INTO {schema}.{table} ({columns}) \
-            VALUES {values};"""
-        ).format(
+    #    Column types and converters are fixed per column, so resolve them
+    #    once instead of per cell.
+    col_types = tuple(remote_type_texts[c] for c in common_cols)
+    adapters = tuple(_make_adapter(rtype) for rtype in col_types)
+
+    #    Rows are rendered by psycopg2's C adapters through mogrify with a
+    #    "(%s::type, ...)" row template built once per copy.
+    row_template = (
+        "("
+        + ", ".join(f"%s::{rtype.replace('%', '%%')}" for rtype in col_types)
+        + ")"
+    )
+
+    def build_insert_values_chunk(
+        cur: psycopg2.extensions.cursor, chunk: list[tuple[Any, ...]]
+    ) -> str:
+        # One mogrify call renders the whole VALUES list, so quoting and
+        # joining the rows happen in psycopg2's C code
+        template = ", ".join(itertools.repeat(row_template, len(chunk)))
+        values = [
+            adapt(cell) for r in chunk for adapt, cell in zip(adapters, r)
+        ]
+        return cur.mogrify(template, values).decode("utf-8")
+
+    # 5) Execute per-batch on the remote via dblink_exec. The statement
+    #    prefix does not change between chunks, so render it once.
+    insert_prefix = (
+        sql.SQL("INSERT INTO {schema}.{table} ({columns}) VALUES ")
+        .format(
             schema=sql.Identifier(remote_schema),
             table=sql.Identifier(remote_table),
-            columns=sql.SQL(", ").join(column_identifiers),
-            values=sql.SQL(values_sql),
+            columns=columns_sql,
         )
+        .as_string(conn)
+    )
+    #    Each chunk runs inside a savepoint, sent in the same round trip. A
+    #    failed chunk only rolls back to its savepoint, which keeps the
+    #    transaction, and with it the source cursor, usable.
+    exec_chunk = sql.SQL(
+        "SAVEPOINT pgcopy_chunk; "
+        "SELECT dblink_exec(%s, %s); "
+        "RELEASE SAVEPOINT pgcopy_chunk;"
+    )
+    rows_copied = 0
+    rows_total = 0
+    for chunk_no, chunk in enumerate(chunks, start=1):
+        rows_total = rows_total + len(chunk)
+        sent = False
         try:
             with conn.cursor() as cur:
-                insert_stmt_str = insert_stmt.as_string(conn)
-                cur.execute("BEGIN;")
-                cur.execute(
-                    sql.SQL("SELECT dblink_exec(%s, %s);"),
-                    (remote_server, insert_stmt_str),
-                )
-                cur.execute("COMMIT;")
+                values_sql = build_insert_values_chunk(cur, chunk)
+                insert_stmt_str = insert_prefix + values_sql + ";"
+                sent = True
+                cur.execute(exec_chunk, (remote_server, insert_stmt_str))
             rows_copied = rows_copied + len(chunk)
-            if len(rows) > batch_size:
-                logging.info(f"✅ Chunk {i // batch_size + 1} inserted")
+            if chunk_no > 1 or len(chunk) == batch_size:
+                logging.info(f"✅ Chunk {chunk_no} inserted")
         except Exception as e:
-            with conn.cursor() as cur:
-                cur.execute("ROLLBACK;")
-            logging.error(f"❌ Chunk {i // batch_size + 1} failed: {e}")
+            # Clear the aborted chunk; the remote side commits each
+            # dblink_exec call on its own
+            if sent:
+                with conn.cursor() as cur:
+                    cur.execute("ROLLBACK TO SAVEPOINT pgcopy_chunk;")
+            logging.error(f"❌ Chunk {chunk_no} failed: {e}")
             # logging.error(insert_stmt)
 
     conn.commit()
 
+    if rows_total == 0:
+        logging.warning("No rows to copy.")
+        return False
+
     # _drop_server_object(conn, remote_server)
     logging.info(
-        f"Copied {rows_copied}/{len(rows)} row(s) from "
+        f"Copied {rows_copied}/{rows_total} row(s) from "
         f"{local_schema}.{local_table} → "
         f"{remote_schema}.{remote_table} via dblink_exec."
     )
 
-    return rows_copied == len(rows)
+    return rows_copied == rows_total
+
+
+def copy_local_to_remote_via_copy(
+    conn: psycopg2.extensions.connection,
+    remote_conn: psycopg2.extensions.connection,
+    local_schema: str,
+    local_table: str,
+    remote_schema: str,
+    remote_table: str,
+    row_limit: Optional[int] = None,
+) -> bool:
+    """
+    Copy rows from a local table to a remote PostgreSQL database using COPY.
+
+    The function:
+
+    * gets remote column names and types over the remote connection,
+    * determines the intersection of local and remote columns,
+    * streams the local rows with COPY ... TO STDOUT into a spooled buffer,
+    * loads the buffer into the remote table with COPY ... FROM STDIN.
+
+    Rows never pass through Python value conversion; the remote server
+    parses each field with the input function of its declared column type.
+
+    Returns
+    -------
+    bool
+        True if all rows were copied successfully, False otherwise.
+    """
+    remote_cols = _get_cols_and_types(remote_conn, remote_schema, remote_table)
+    remote_col_names = [name for name, _ in remote_cols]
+    local_cols = _get_local_col_names(
+        conn, local_schema, local_table, remote_col_names
+    )
+
+    common_cols = [c for c in remote_col_names if c in local_cols]
+    if not common_cols:
+        raise ValueError(
+            "No overlapping columns between local and remote tables."
+        )
+    columns = sql.SQL(", ").join(sql.Identifier(c) for c in common_cols)
+
+    select_q = sql.SQL("SELECT {cols} FROM {sch}.{tbl}").format(
+        cols=columns,
+        sch=sql.Identifier(local_schema),
+        tbl=sql.Identifier(local_table),
+    )
+    if row_limit is not None:
+        select_q = select_q + sql.SQL(" LIMIT {}").format(
+            sql.Literal(row_limit)
+        )
+    copy_out = sql.SQL("COPY ({query}) TO STDOUT").format(query=select_q)
+    copy_in = sql.SQL("COPY {sch}.{tbl} ({cols}) FROM STDIN").format(
+        sch=sql.Identifier(remote_schema),
+        tbl=sql.Identifier(remote_table),
+        cols=columns,
+    )
+
+    with tempfile.SpooledTemporaryFile(max_size=DEFAULT_SPOOL_SIZE) as buf:
+        with conn.cursor() as cur:
+            cur.copy_expert(copy_out, buf, size=DEFAULT_COPY_BUFFER_SIZE)
+            rows_read = cur.rowcount
+        conn.commit()
+
+        if rows_read == 0:
+            logging.warning("No rows to copy.")
+            return False
+
+        buf.seek(0)
+        try:
+            with remote_conn.cursor() as cur:
+                cur.copy_expert(copy_in, buf, size=DEFAULT_COPY_BUFFER_SIZE)
+                rows_copied = cur.rowcount
+            remote_conn.commit()
+        except Exception as e:
+            remote_conn.rollback()
+            logging.error(
+                f"❌ COPY into {remote_schema}.{remote_table} failed: {e}"
+            )
+            return False
+
+    logging.info(
+        f"Copied {rows_copied}/{rows_read} row(s) from "
+        f"{local_schema}.{local_table} → "
+        f"{remote_schema}.{remote_table} via COPY."
+    )
+
+    return rows_copied == rows_read
+
+
+def create_dblink_extension(conn: psycopg2.extensions.connection) -> None:
+    """
+    Creates the dblink extension if it is missing. Concurrent
+    CREATE EXTENSION IF NOT EXISTS calls can fail with a duplicate key
+    error while the extension does not exist yet, so run this once before
+    copying from several sessions at a time.
+    """
+    with conn.cursor() as cur:
+        cur.execute("CREATE EXTENSION IF NOT EXISTS dblink;")
+    conn.commit()
 
 
 def _create_server_object(
@@ -285,40 +531,37 @@ def _create_server_object(
     dblink.
     """
 
-    with conn.cursor() as cur:
-        cur.execute("CREATE EXTENSION IF NOT EXISTS dblink;")
-
-        _drop_server_object(conn, remote_server)
-
-        cur.execute(
-            sql.SQL(
-                f"""
-            CREATE SERVER IF NOT EXISTS {remote_server}
-            FOREIGN DATA WRAPPER postgres_fdw
-            OPTIONS (host %s, port %s, dbname %s);
+    # One round trip: extension, server and user mapping are (re)created in
+    # a single statement batch. Once the extension exists, CREATE EXTENSION
+    # IF NOT EXISTS is a no-op; see create_dblink_extension().
+    create_sql = sql.SQL(
         """
-            ),
-            [remote_host, str(remote_port), remote_db],
-        )
-
-        cur.execute(
-            sql.SQL(
-                f"""
-            CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER
-            SERVER {remote_server}
-            OPTIONS (user %s, password %s);
+        CREATE EXTENSION IF NOT EXISTS dblink;
+        DROP SERVER IF EXISTS {srv} {cascade};
+        CREATE SERVER {srv}
+        FOREIGN DATA WRAPPER postgres_fdw
+        OPTIONS (host %s, port %s, dbname %s);
+        CREATE USER MAPPING FOR CURRENT_USER
+        SERVER {srv}
+        OPTIONS (user %s, password %s);
         """
-            ),
-            [remote_user, remote_password],
-        )
+    ).format(
+        srv=sql.Identifier(remote_server),
+        cascade=sql.SQL("CASCADE") if CASCADE else sql.SQL(""),
+    )
 
+    with conn.cursor() as cur:
         cur.execute(
-            "SELECT srvname, srvoptions FROM pg_foreign_server",
-            [remote_server],
+            create_sql,
+            [
+                remote_host,
+                str(remote_port),
+                remote_db,
+                remote_user,
+                remote_password,
+            ],
         )
-        cur.fetchone()
-
-        conn.commit()
+    conn.commit()
 
 
 def _drop_server_object(
@@ -329,10 +572,10 @@ def _drop_server_object(
     """
     Drops a postgres_fdw server object.
     """
+    # Only the server name needs quoting; the rest of the statement is fixed
+    srv = sql.Identifier(server_name).as_string(conn)
     with conn.cursor() as cur:
-        drop_sql = sql.SQL("DROP SERVER IF EXISTS {srv} {cascade};").format(
-            srv=sql.Identifier(server_name),
-            cascade=sql.SQL("CASCADE") if cascade else sql.SQL(""),
+        cur.execute(
+            f"DROP SERVER IF EXISTS {srv}{' CASCADE' if cascade else ''};"
         )
-        cur.execute(drop_sql)
     conn.commit()
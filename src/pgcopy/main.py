@@ -1,3 +1,5 @@
+import psycopg2
+
 import pgcopy.config
 from pgcopy.aws_secrets import get_secret
 from pgcopy.connection import create_pg_connection
@@ -9,31 +11,55 @@ def start() -> None:
     """
     Entry point for the data copy pipeline.
 
-    Creates the source connection, builds the routing configuration and
-    dispatches copy operations for all configured routes.
+    Loads the source secrets, builds the routing configuration and
+    dispatches copy operations for all configured routes, each of which
+    connects to the source through the SSH tunnel.
     """
     # Get source secrets
     (host, port, user, password, db_name, ssh_key) = get_secret(
         pgcopy.config.source
     )
 
-    # Create connection via SSH tunnel
-    conn, ssh_client = create_pg_connection(
-        ssh_host=pgcopy.config.ssh_host,
-        ssh_user="ec2-user",
-        ssh_key=ssh_key,
-        remote_host=host,
-        db_name=db_name,
-        db_password=password,
-    )
+    def connect() -> psycopg2.extensions.connection:
+        # Create connection via SSH tunnel. The SSH client is pooled, so
+        # every connection after the first reuses the same tunnel.
+        conn, _ = create_pg_connection(
+            ssh_host=pgcopy.config.ssh_host,
+            ssh_user="ec2-user",
+            ssh_key=ssh_key,
+            remote_host=host,
+            db_name=db_name,
+            db_password=password,
+        )
+        return conn
+
+    def connect_remote(
+        remote_host: str,
+        remote_port: int,
+        remote_db: str,
+        remote_password: str,
+    ) -> psycopg2.extensions.connection:
+        # Direct connection to a target database through its own tunnel on
+        # a free local port
+        conn, _ = create_pg_connection(
+            ssh_host=pgcopy.config.ssh_host,
+            ssh_user="ec2-user",
+            ssh_key=ssh_key,
+            remote_host=remote_host,
+            remote_port=remote_port,
+            db_name=remote_db,
+            db_password=remote_password,
+            local_port=0,
+        )
+        return conn
 
     routing = build_routing()
 
-    # Copy tables
+    # Copy tables; every route opens and closes its own connection
     process_all_routes(
-        conn, local_schema=pgcopy.config.source_schema, routing=routing
+        connect,
+        local_schema=pgcopy.config.source_schema,
+        routing=routing,
+        connect_remote=connect_remote if pgcopy.config.direct_copy else None,
+        max_workers=pgcopy.config.max_workers,
     )
-
-    # Cleanup
-    conn.close()
-    ssh_client.close()
@@ -1,12 +1,21 @@
+import hashlib
 import logging
+import re
 import sys
-import traceback
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Optional
 
 import psycopg2
 
-from pgcopy.fdw_copy import copy_local_to_remote_via_dblink_values
+import pgcopy.config
+from pgcopy.fdw_copy import (
+    copy_local_to_remote_via_copy,
+    copy_local_to_remote_via_dblink_values,
+    create_dblink_extension,
+)
 
 log_dir = Path("log")
 log_dir.mkdir(parents=True, exist_ok=True)
@@ -25,72 +34,172 @@ logging.basicConfig(
 
 DEFAULT_REMOTE_SERVER_PREFIX = "pygrate_"
 
+# PostgreSQL truncates identifiers longer than this many bytes
+_MAX_IDENTIFIER_LENGTH = 63
 
-def _force_str(v: int | str | list[str]) -> str:
-    return str(v) if isinstance(v, int | str) else v[0]
+# Opens a connection to a remote database: (host, port, db, password)
+RemoteConnect = Callable[[str, int, str, str], psycopg2.extensions.connection]
 
 
-def _force_list(v: int | str | list[str]) -> list[str]:
-    return v if isinstance(v, list) else [str(v)]
+@dataclass(frozen=True, slots=True)
+class Route:
+    """
+    Copy target of a single remote host: database, credentials and the
+    tables to copy into it.
+    """
 
+    db: str
+    password: str
+    tables: tuple[str, ...]
+    port: int = 5432
+    schema: str = "public"
 
-def _ensure_int(v: int | str | list[str]) -> int:
-    if isinstance(v, int):
-        return v
-    raise TypeError(f"Expected int, got {type(v)}")
 
+def _remote_server_name(prefix: str, db: str, host: str) -> str:
+    """
+    Returns the dblink server object name for a route. It includes the
+    host, so routes to databases of the same name on different hosts do
+    not drop each other's server while copying concurrently. Names that
+    would be truncated end in a hash of the full name to stay unique.
+    """
+    name = re.sub(r"[^0-9a-z_]", "_", f"{prefix}{db}_{host}".lower())
+    if len(name) > _MAX_IDENTIFIER_LENGTH:
+        digest = hashlib.sha256(name.encode("utf-8")).hexdigest()[:8]
+        name = f"{name[:_MAX_IDENTIFIER_LENGTH - 9]}_{digest}"
+    return name
 
-def process_all_routes(
-    conn: psycopg2.extensions.connection,
+
+def _process_route(
+    connect: Callable[[], psycopg2.extensions.connection],
     local_schema: str,
-    routing: dict[str, dict[str, int | str | list[str]]],
-    remote_server_prefix: str = DEFAULT_REMOTE_SERVER_PREFIX,
+    host: str,
+    route: Route,
+    remote_server_prefix: str,
+    connect_remote: Optional[RemoteConnect] = None,
 ) -> None:
     """
-    Executes bulk copy operations for all configured remote hosts.
-
-    For every host in the routing configuration, this function iterates over
-    all listed tables and invokes `copy_local_to_remote_via_dblink_values` to
-    copy data from the local schema into the corresponding remote schema via
-    dblink.
+    Copies all tables of a single route over a connection of its own.
+    Failures are logged, per table or, if the connections cannot be
+    opened, for the whole route.
     """
-    for host, cfg in routing.items():
-        dbname = cfg["db"]
-        pwd = cfg["password"]
-        tables: list[str] = _force_list(cfg["tables"])
-        remote_port = cfg.get("port", 5432)
-        remote_schema = cfg.get("schema", "public")
-
-        remote_server = f"{remote_server_prefix}{dbname}".replace("-", "_")
-        logging.info(
-            f"\n=== Processing remote {dbname}@{host} "
-            f"({len(tables)} table(s)) ==="
-        )
+    remote_server = _remote_server_name(remote_server_prefix, route.db, host)
+    logging.info(
+        f"\n=== Processing remote {route.db}@{host} "
+        f"({len(route.tables)} table(s)) ==="
+    )
+
+    conn = None
+    remote_conn = None
+    try:
+        conn = connect()
+        if connect_remote is not None:
+            remote_conn = connect_remote(
+                host, route.port, route.db, route.password
+            )
 
-        for local_table in tables:
+        for local_table in route.tables:
             remote_table = local_table
             logging.info(
-                f"→ Copying {local_schema}.{local_table} → {dbname}."
+                f"→ Copying {local_schema}.{local_table} → {route.db}."
                 f"{remote_table}"
             )
             try:
-                done = copy_local_to_remote_via_dblink_values(
-                    conn=conn,
-                    local_schema=local_schema,
-                    local_table=local_table,
-                    remote_schema=_force_str(remote_schema),
-                    remote_table=remote_table,
-                    remote_host=host,
-                    remote_port=_ensure_int(remote_port),
-                    remote_password=_force_str(pwd),
-                    remote_db=_force_str(dbname),
-                    remote_server=remote_server,
-                )
+                if remote_conn is not None:
+                    done = copy_local_to_remote_via_copy(
+                        conn=conn,
+                        remote_conn=remote_conn,
+                        local_schema=local_schema,
+                        local_table=local_table,
+                        remote_schema=route.schema,
+                        remote_table=remote_table,
+                    )
+                else:
+                    done = copy_local_to_remote_via_dblink_values(
+                        conn=conn,
+                        local_schema=local_schema,
+                        local_table=local_table,
+                        remote_schema=route.schema,
+                        remote_table=remote_table,
+                        remote_host=host,
+                        remote_port=route.port,
+                        remote_password=route.password,
+                        remote_db=route.db,
+                        remote_server=remote_server,
+                    )
                 icon = "✅" if done else "⚠️"
                 logging.info(f"{icon} Done: {local_table}")
             except Exception as e:
-                logging.info(
+                logging.exception(
                     f"❌ Error copying {local_table} "
                     f"({e.__class__.__name__}): {e}"
                 )
-                traceback.print_exc()
+    except Exception as e:
+        # Connection setup failed; log it here so that every failed route
+        # is reported, not only the first one re-raised by its future
+        logging.exception(
+            f"❌ Route {route.db}@{host} failed "
+            f"({e.__class__.__name__}): {e}"
+        )
+    finally:
+        if remote_conn is not None:
+            remote_conn.close()
+        if conn is not None:
+            conn.close()
+
+
+def process_all_routes(
+    connect: Callable[[], psycopg2.extensions.connection],
+    local_schema: str,
+    routing: dict[str, Route],
+    remote_server_prefix: str = DEFAULT_REMOTE_SERVER_PREFIX,
+    connect_remote: Optional[RemoteConnect] = None,
+    max_workers: int = pgcopy.config.max_workers,
+) -> None:
+    """
+    Executes bulk copy operations for all configured remote hosts.
+
+    For every host in the routing configuration, this function iterates over
+    all listed tables and invokes `copy_local_to_remote_via_dblink_values` to
+    copy data from the local schema into the corresponding remote schema via
+    dblink.
+
+    If `connect_remote` is given, every route instead opens a direct
+    connection to its remote database and copies the tables with
+    `copy_local_to_remote_via_copy` (COPY ... FROM STDIN), which needs no
+    dblink server objects.
+
+    Hosts are processed concurrently, at most `max_workers` at a time
+    (1 copies them one after another). psycopg2 connections must not be
+    shared between threads, so every worker opens its own source connection
+    through `connect` and closes it when done. The tables of one host stay
+    on one worker, because each dblink copy recreates that host's server
+    object. For the dblink path, the extension is created once up front
+    so that the workers do not race to create it.
+    """
+    if not routing:
+        return
+
+    if connect_remote is None:
+        conn = connect()
+        try:
+            create_dblink_extension(conn)
+        finally:
+            conn.close()
+
+    workers = max(1, min(max_workers, len(routing)))
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _process_route,
+                connect,
+                local_schema,
+                host,
+                route,
+                remote_server_prefix,
+                connect_remote,
+            )
+            for host, route in routing.items()
+        ]
+
+    for future in futures:
+        future.result()
@@ -4,9 +4,11 @@ from unittest.mock import patch
 import pytest
 from botocore.exceptions import ClientError
 
+import pgcopy.aws_secrets
 import pgcopy.config
 from pgcopy.aws_secrets import (
     _ensure_dict,
+    _fetch_secret_string,
     _retrieve_from_aws,
     format_secret,
     get_secret,
@@ -14,6 +16,13 @@ from pgcopy.aws_secrets import (
 )
 
 
+@pytest.fixture(autouse=True)
+def _clear_secret_cache(monkeypatch):
+    monkeypatch.setattr(pgcopy.aws_secrets, "_SESSION", None)
+    monkeypatch.setattr(pgcopy.aws_secrets, "_CLIENTS", {})
+    monkeypatch.setattr(pgcopy.aws_secrets, "_SECRET_CACHE", {})
+
+
 def test_format_secret_extracts_expected_tuple():
     data = {
         "host": "h",
@@ -38,12 +47,12 @@ def test_get_secret_uses_retrieve_and_formats(mock_retrieve):
         "ssh": "ssh-key",
     }
     host, port, user, password, db_name, ssh = get_secret(
-        "name", region_name=f"{pgcopy.config.region}"
+        "name", region_name=pgcopy.config.region
     )
     assert host == "h"
     assert db_name == "db"
     assert ssh == "ssh-key"
-    mock_retrieve.assert_called_once_with("name", f"{pgcopy.config.region}")
+    mock_retrieve.assert_called_once_with("name", pgcopy.config.region)
 
 
 @patch("pgcopy.aws_secrets._retrieve_from_aws")
@@ -62,16 +71,71 @@ def test_retrieve_from_aws_success(mock_session_cls):
         "SecretString": json.dumps({"host": "h"})
     }
 
-    result = _retrieve_from_aws("name", region_name=f"{pgcopy.config.region}")
+    result = _retrieve_from_aws("name", region_name=pgcopy.config.region)
 
     mock_session.client.assert_called_once_with(
         service_name="secretsmanager",
-        region_name=f"{pgcopy.config.region}",
+        region_name=pgcopy.config.region,
     )
     mock_client.get_secret_value.assert_called_once_with(SecretId="name")
     assert result == {"host": "h"}
 
 
+@patch("pgcopy.aws_secrets.boto3.session.Session")
+def test_retrieve_from_aws_caches_secret_string(mock_session_cls):
+    mock_session = mock_session_cls.return_value
+    mock_client = mock_session.client.return_value
+
+    mock_client.get_secret_value.return_value = {
+        "SecretString": json.dumps({"host": "h"})
+    }
+
+    first = _retrieve_from_aws("name", region_name=pgcopy.config.region)
+    second = _retrieve_from_aws("name", region_name=pgcopy.config.region)
+
+    mock_client.get_secret_value.assert_called_once_with(SecretId="name")
+    assert first == second == {"host": "h"}
+    assert first is not second
+
+
+@patch("pgcopy.aws_secrets.time.monotonic")
+@patch("pgcopy.aws_secrets.boto3.session.Session")
+def test_fetch_secret_string_refetches_after_ttl(
+    mock_session_cls, mock_monotonic
+):
+    mock_client = mock_session_cls.return_value.client.return_value
+    mock_client.get_secret_value.side_effect = [
+        {"SecretString": "old"},
+        {"SecretString": "rotated"},
+    ]
+
+    mock_monotonic.return_value = 1000.0
+    assert _fetch_secret_string("name", "region", ttl=60) == "old"
+    mock_monotonic.return_value = 1059.0
+    assert _fetch_secret_string("name", "region", ttl=60) == "old"
+    mock_monotonic.return_value = 1060.0
+    assert _fetch_secret_string("name", "region", ttl=60) == "rotated"
+
+    assert mock_client.get_secret_value.call_count == 2
+
+
+@patch("pgcopy.aws_secrets.boto3.session.Session")
+def test_retrieve_from_aws_reuses_session_and_client(mock_session_cls):
+    mock_session = mock_session_cls.return_value
+    mock_client = mock_session.client.return_value
+
+    mock_client.get_secret_value.return_value = {
+        "SecretString": json.dumps({"host": "h"})
+    }
+
+    _retrieve_from_aws("first", region_name=pgcopy.config.region)
+    _retrieve_from_aws("second", region_name=pgcopy.config.region)
+
+    mock_session_cls.assert_called_once()
+    mock_session.client.assert_called_once()
+    assert mock_client.get_secret_value.call_count == 2
+
+
 @patch("pgcopy.aws_secrets.boto3.session.Session")
 def test_retrieve_from_aws_raises_client_error(mock_session_cls):
     mock_session = mock_session_cls.return_value
@@ -84,7 +148,7 @@ def test_retrieve_from_aws_raises_client_error(mock_session_cls):
     mock_client.get_secret_value.side_effect = error
 
     with pytest.raises(ClientError):
-        _retrieve_from_aws("name", region_name=f"{pgcopy.config.region}")
+        _retrieve_from_aws("name", region_name=pgcopy.config.region)
 
 
 def test_ensure_dict_raises_on_none():
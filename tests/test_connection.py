@@ -1,23 +1,87 @@
 import base64
 import hashlib
+import selectors
+import threading
+import time
+from types import SimpleNamespace
 from unittest.mock import MagicMock, patch
 
 import pytest
 
-from pgcopy.connection import _forward_tunnel, create_pg_connection
-
-
-@patch("pgcopy.connection.select.select")
+import pgcopy.connection
+from pgcopy.connection import (
+    DEFAULT_BUFFER_SIZE,
+    _forward_tunnel,
+    _listen,
+    close_ssh_pool,
+    create_pg_connection,
+)
+
+
+@pytest.fixture(autouse=True)
+def _empty_ssh_pool(monkeypatch):
+    monkeypatch.setattr(pgcopy.connection, "_SSH_POOL", {})
+    monkeypatch.setattr(pgcopy.connection, "_TUNNELS", {})
+    pgcopy.connection._verify_fingerprint.cache_clear()
+
+
+@pytest.fixture
+def mock_listen():
+    """
+    Replace the tunnel listener with mocks that report consecutive local
+    ports, starting at 5432.
+    """
+    listeners = []
+
+    def listen(local_host, local_port):
+        sock = MagicMock()
+        sock.getsockname.return_value = (local_host, 5432 + len(listeners))
+        sock.accept.side_effect = OSError("closed")
+        listeners.append(sock)
+        return sock
+
+    with patch("pgcopy.connection._listen", side_effect=listen) as mock:
+        mock.listeners = listeners
+        yield mock
+
+
+def _fake_selector(select_side_effect):
+    """
+    Create a stand-in for selectors.DefaultSelector whose select() returns
+    (key, events) pairs for the file objects yielded by select_side_effect,
+    carrying the data they were registered with.
+    """
+    selector = MagicMock()
+    registered = {}
+
+    def register(fileobj, events, data=None):
+        registered[id(fileobj)] = data
+
+    def select(timeout=None):
+        return [
+            (
+                SimpleNamespace(fileobj=f, data=registered[id(f)]),
+                selectors.EVENT_READ,
+            )
+            for f in select_side_effect()
+        ]
+
+    selector.register.side_effect = register
+    selector.select.side_effect = select
+    return selector
+
+
+@patch("pgcopy.connection._SELECTOR_FACTORY")
 @patch("pgcopy.connection.socket.socket")
 def test_forward_tunnel_handles_one_connection_and_exits(
-    mock_socket, mock_select
+    mock_socket, mock_selector_cls
 ):
     transport = MagicMock()
     chan = MagicMock()
     transport.open_channel.return_value = chan
 
     client_sock = MagicMock()
-    client_sock.recv.return_value = b""
+    client_sock.recv_into.return_value = 0
     client_sock.getpeername.return_value = ("127.0.0.1", 1111)
 
     sock = MagicMock()
@@ -33,10 +97,7 @@ def test_forward_tunnel_handles_one_connection_and_exits(
 
     sock.accept.side_effect = accept_side_effect
 
-    def select_side_effect(readers, *_args, **_kwargs):
-        return ([client_sock], [], [])
-
-    mock_select.side_effect = select_side_effect
+    mock_selector_cls.return_value = _fake_selector(lambda: [client_sock])
 
     with pytest.raises(KeyboardInterrupt):
         _forward_tunnel("remote-host", 5432, transport, local_port=0)
@@ -55,6 +116,7 @@ def test_create_pg_connection_opens_ssh_and_returns_connection(
     mock_ssh_client_cls,
     mock_rsa_from_key,
     mock_pg_connect,
+    mock_listen,
 ):
     raw = b"dummy-server-key"
     ssh_client = MagicMock()
@@ -89,6 +151,123 @@ def test_create_pg_connection_opens_ssh_and_returns_connection(
     assert client is ssh_client
 
 
+def _ssh_client_with_key(raw):
+    ssh_client = MagicMock()
+    transport = ssh_client.get_transport.return_value
+    transport.get_remote_server_key.return_value.asbytes.return_value = raw
+    digest = hashlib.sha256(raw).digest()
+    fingerprint = base64.b64encode(digest).rstrip(b"=").decode("ascii")
+    return ssh_client, fingerprint
+
+
+@patch("pgcopy.connection.threading.Thread")
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_create_pg_connection_reuses_pooled_ssh_client(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+    mock_thread_cls,
+    mock_listen,
+):
+    ssh_client, fingerprint = _ssh_client_with_key(b"pooled-key")
+    ssh_client.get_transport.return_value.is_active.return_value = True
+    mock_ssh_client_cls.return_value = ssh_client
+
+    for _ in range(2):
+        _, client = create_pg_connection(
+            ssh_host="ssh-host",
+            ssh_user="user",
+            ssh_key="PRIVATE_KEY",
+            remote_host="db-host",
+            db_password="pwd",
+            expected_fingerprint=fingerprint,
+        )
+        assert client is ssh_client
+
+    mock_ssh_client_cls.assert_called_once()
+    ssh_client.connect.assert_called_once()
+    mock_thread_cls.assert_called_once()
+    assert mock_pg_connect.call_count == 2
+
+    close_ssh_pool()
+
+    ssh_client.close.assert_called_once()
+    mock_listen.listeners[0].close.assert_called_once()
+    assert pgcopy.connection._SSH_POOL == {}
+    assert pgcopy.connection._TUNNELS == {}
+
+
+@patch("pgcopy.connection.threading.Thread")
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_create_pg_connection_opens_one_tunnel_per_remote(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+    mock_thread_cls,
+    mock_listen,
+):
+    ssh_client, fingerprint = _ssh_client_with_key(b"pooled-key")
+    ssh_client.get_transport.return_value.is_active.return_value = True
+    mock_ssh_client_cls.return_value = ssh_client
+
+    for remote_host in ("db-a", "db-b", "db-a"):
+        create_pg_connection(
+            ssh_host="ssh-host",
+            ssh_user="user",
+            ssh_key="PRIVATE_KEY",
+            remote_host=remote_host,
+            db_password="pwd",
+            expected_fingerprint=fingerprint,
+            local_port=0,
+        )
+
+    ssh_client.connect.assert_called_once()
+    assert mock_thread_cls.call_count == 2
+    assert [c.args for c in mock_listen.call_args_list] == [
+        ("localhost", 0),
+        ("localhost", 0),
+    ]
+    ports = [c.kwargs["port"] for c in mock_pg_connect.call_args_list]
+    assert ports == [5432, 5433, 5432]
+
+
+@patch("pgcopy.connection.threading.Thread")
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_create_pg_connection_replaces_inactive_pooled_client(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+    mock_thread_cls,
+    mock_listen,
+):
+    stale, fingerprint = _ssh_client_with_key(b"pooled-key")
+    stale.get_transport.return_value.is_active.return_value = False
+    fresh, _ = _ssh_client_with_key(b"pooled-key")
+    mock_ssh_client_cls.side_effect = [stale, fresh]
+
+    for _ in range(2):
+        _, client = create_pg_connection(
+            ssh_host="ssh-host",
+            ssh_user="user",
+            ssh_key="PRIVATE_KEY",
+            remote_host="db-host",
+            db_password="pwd",
+            expected_fingerprint=fingerprint,
+        )
+
+    assert client is fresh
+    stale.close.assert_called_once()
+    mock_listen.listeners[0].close.assert_called_once()
+    fresh.connect.assert_called_once()
+    assert mock_thread_cls.call_count == 2
+
+
 @patch("pgcopy.connection.psycopg2.connect")
 @patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
 @patch("pgcopy.connection.paramiko.SSHClient")
@@ -122,6 +301,123 @@ def test_fingerprint_mismatch_raises_value_error(
         )
 
 
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_fingerprint_of_other_key_raises_and_closes_client(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+):
+    ssh_client, _ = _ssh_client_with_key(b"server-key")
+    mock_ssh_client_cls.return_value = ssh_client
+    _, other_fingerprint = _ssh_client_with_key(b"other-key")
+
+    with pytest.raises(ValueError, match="Unexpected SSH host key"):
+        create_pg_connection(
+            ssh_host="ssh-host",
+            ssh_user="user",
+            ssh_key="PRIVATE_KEY",
+            remote_host="db-host",
+            db_password="pwd",
+            expected_fingerprint=other_fingerprint,
+        )
+
+    ssh_client.close.assert_called_once()
+    mock_pg_connect.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "mangle",
+    [
+        lambda fp: f"SHA256:{fp}",
+        lambda fp: fp[:10] + "!!!!" + fp[10:],
+        lambda fp: fp + "==",
+    ],
+)
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_malformed_fingerprint_is_reported_as_mismatch(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+    mangle,
+):
+    ssh_client, fingerprint = _ssh_client_with_key(b"server-key")
+    mock_ssh_client_cls.return_value = ssh_client
+
+    with pytest.raises(ValueError) as excinfo:
+        create_pg_connection(
+            ssh_host="ssh-host",
+            ssh_user="user",
+            ssh_key="PRIVATE_KEY",
+            remote_host="db-host",
+            db_password="pwd",
+            expected_fingerprint=mangle(fingerprint),
+        )
+
+    assert str(excinfo.value) == (
+        f"Unexpected SSH host key fingerprint: {fingerprint}"
+    )
+    ssh_client.close.assert_called_once()
+    mock_pg_connect.assert_not_called()
+
+
+@patch("pgcopy.connection.psycopg2.connect")
+@patch("pgcopy.connection.paramiko.RSAKey.from_private_key")
+@patch("pgcopy.connection.paramiko.SSHClient")
+def test_fingerprint_verification_is_cached_per_server_key(
+    mock_ssh_client_cls,
+    mock_rsa_from_key,
+    mock_pg_connect,
+    mock_listen,
+):
+    first, fingerprint = _ssh_client_with_key(b"server-key")
+    second, _ = _ssh_client_with_key(b"server-key")
+    mock_ssh_client_cls.side_effect = [first, second]
+
+    with patch(
+        "pgcopy.connection.hashlib.sha256", wraps=hashlib.sha256
+    ) as mock_sha256:
+        for ssh_host in ("bastion-a", "bastion-b"):
+            create_pg_connection(
+                ssh_host=ssh_host,
+                ssh_user="user",
+                ssh_key="PRIVATE_KEY",
+                remote_host="db-host",
+                db_password="pwd",
+                expected_fingerprint=fingerprint,
+            )
+
+    assert mock_ssh_client_cls.call_count == 2
+    mock_sha256.assert_called_once()
+
+
+def test_evict_stops_forwarder_and_frees_port():
+    key = ("ssh-host", "user")
+    listener = _listen("127.0.0.1", 0)
+    port = listener.getsockname()[1]
+    pgcopy.connection._SSH_POOL[key] = MagicMock()
+    pgcopy.connection._TUNNELS[(key, "db-host", 5432)] = listener
+
+    forwarder = threading.Thread(
+        target=_forward_tunnel,
+        args=("db-host", 5432, MagicMock(), "127.0.0.1", port, listener),
+        daemon=True,
+    )
+    forwarder.start()
+    # Let the forwarder block in accept()
+    time.sleep(0.1)
+
+    close_ssh_pool()
+    forwarder.join(timeout=5)
+
+    assert not forwarder.is_alive()
+    assert pgcopy.connection._TUNNELS == {}
+    _listen("127.0.0.1", port).close()
+
+
 @patch("pgcopy.connection.threading.Thread")
 @patch("pgcopy.connection.socket.socket")
 def test_forward_tunnel_handles_missing_channel(
@@ -172,32 +468,35 @@ def test_forward_tunnel_handles_missing_channel(
         )
 
 
-@patch("pgcopy.connection.select.select")
+@patch("pgcopy.connection._SELECTOR_FACTORY")
 @patch("pgcopy.connection.threading.Thread")
 @patch("pgcopy.connection.socket.socket")
 def test_forward_tunnel_copies_data_between_client_and_channel(
     mock_socket_cls,
     mock_thread_cls,
-    mock_select,
+    mock_selector_cls,
 ):
     transport = MagicMock()
 
     class DummyClientSock:
         def __init__(self):
             self.recv_calls = 0
+            self.recv_sizes = []
             self.sent = []
 
         def getsockname(self):
             return ("127.0.0.1", 5000)
 
-        def recv(self, n):
+        def recv_into(self, buf):
             self.recv_calls += 1
+            self.recv_sizes.append(len(buf))
             if self.recv_calls == 1:
-                return b"hello"
-            return b""
+                buf[:5] = b"hello"
+                return 5
+            return 0
 
-        def send(self, data):
-            self.sent.append(data)
+        def sendall(self, data):
+            self.sent.append(bytes(data))
 
         def close(self):
             pass
@@ -207,8 +506,8 @@ def test_forward_tunnel_copies_data_between_client_and_channel(
             self.recv_calls = 0
             self.sent = []
 
-        def send(self, data):
-            self.sent.append(data)
+        def sendall(self, data):
+            self.sent.append(bytes(data))
 
         def recv(self, n):
             self.recv_calls += 1
@@ -239,13 +538,12 @@ def test_forward_tunnel_copies_data_between_client_and_channel(
         [client_sock],
     ]
 
-    def fake_select(read_list, write_list, exc_list):
+    def fake_select():
         if not events:
             raise KeyboardInterrupt()
-        r = events.pop(0)
-        return (r, [], [])
+        return events.pop(0)
 
-    mock_select.side_effect = fake_select
+    mock_selector_cls.return_value = _fake_selector(fake_select)
 
     class DummyThread:
         def __init__(self, target, args=(), daemon=None):
@@ -271,14 +569,15 @@ def test_forward_tunnel_copies_data_between_client_and_channel(
 
     assert b"hello" in chan.sent
     assert b"world" in client_sock.sent
+    assert client_sock.recv_sizes == [DEFAULT_BUFFER_SIZE] * 2
 
 
 @patch("pgcopy.connection.threading.Thread")
-@patch("pgcopy.connection.select.select")
+@patch("pgcopy.connection._SELECTOR_FACTORY")
 @patch("pgcopy.connection.socket.socket")
 def test_forward_tunnel_breaks_when_remote_channel_closes(
     mock_socket_cls,
-    mock_select,
+    mock_selector_cls,
     mock_thread_cls,
 ):
     transport = MagicMock()
@@ -299,10 +598,7 @@ def test_forward_tunnel_breaks_when_remote_channel_closes(
         KeyboardInterrupt,
     ]
 
-    def fake_select(read_list, *_):
-        return ([chan], [], [])
-
-    mock_select.side_effect = fake_select
+    mock_selector_cls.return_value = _fake_selector(lambda: [chan])
 
     chan.recv.return_value = b""
 
@@ -328,5 +624,6 @@ def test_forward_tunnel_breaks_when_remote_channel_closes(
             local_port=5000,
         )
 
+    mock_selector_cls.return_value.close.assert_called_once()
     chan.close.assert_called_once()
     client_sock.close.assert_called_once()
@@ -3,95 +3,98 @@ import logging
 from unittest.mock import MagicMock, patch
 
 import pytest
+from psycopg2.extensions import adapt
+from psycopg2.extras import Json
 
 from pgcopy.fdw_copy import (
     _create_server_object,
     _drop_server_object,
+    _get_cols_and_types,
+    _get_local_col_names,
     _get_local_rows,
     _get_remote_cols_and_types,
-    _literal,
+    _iter_local_rows,
+    _make_adapter,
+    copy_local_to_remote_via_copy,
     copy_local_to_remote_via_dblink_values,
+    create_dblink_extension,
 )
 
 
-def test_literal_none_returns_NULL():
-    assert _literal(None) == "NULL"
+def _quoted(v):
+    return adapt(v).getquoted().decode("utf-8")
 
 
-def test_literal_simple_string_is_quoted():
-    out = _literal("hello")
-    assert out == "'hello'"
+def test_make_adapter_keeps_lists_for_array_columns():
+    adapt_array = _make_adapter("text[]")
+    assert adapt_array(["A", None]) == ["A", None]
+    assert _quoted(adapt_array(["A", None, "B"])) == "ARRAY['A',NULL,'B']"
+    assert isinstance(adapt_array({"a": 1}), Json)
+    assert adapt_array(None) is None
 
 
-def test_literal_json_dict_when_rtype_jsonb():
-    v = {"a": 1, "b": "x"}
-    out = _literal(v, rtype="jsonb")
-    assert out.startswith("'")
-    assert out.endswith("'")
-    inner = out[1:-1]
-    data = json.loads(inner)
-    assert data == v
-
+def test_make_adapter_adapts_array_elements():
+    raw = "ümlaut".encode("latin-1")
+    out = _make_adapter("jsonb[]")([{"a": 1}, [raw, None]])
+    assert isinstance(out[0], Json)
+    assert out[1] == ["ümlaut", None]
 
-def test_literal_list_to_text_array():
-    v = ["A", "B"]
-    out = _literal(v, rtype="text[]")
-    assert out.startswith("'")
-    assert out.endswith("'")
-    assert "{A,B}" in out
 
+def test_make_adapter_wraps_json_values():
+    out = _make_adapter("jsonb")({"a": 1})
+    assert isinstance(out, Json)
+    assert json.loads(_quoted(out)[1:-1]) == {"a": 1}
+    assert isinstance(_make_adapter("JSON")("x"), Json)
+    assert _make_adapter("json")(None) is None
 
-def test_literal_list_with_none_to_text_array():
-    v = ["A", None, "B"]
-    out = _literal(v, rtype="text[]")
-    assert out.startswith("'")
-    assert out.endswith("'")
-    inner = out[1:-1]
-    assert "{A,NULL,B}" in inner
 
+def test_make_adapter_json_handles_values_orjson_rejects():
+    out = _make_adapter("jsonb")({"big": 2**70, 1: "x"})
+    assert json.loads(_quoted(out)[1:-1]) == {"big": 2**70, "1": "x"}
 
-def test_literal_bytes_decoding_uses_fallback_codecs():
-    raw = "ümlaut".encode("latin-1")
-    out = _literal(raw)
-    assert out.startswith("'")
-    assert out.endswith("'")
-    inner = out[1:-1]
-    assert "ümlaut" in inner
 
+def test_make_adapter_decodes_bytes_and_passes_scalars():
+    adapt_text = _make_adapter("text")
+    assert adapt_text("ümlaut".encode("latin-1")) == "ümlaut"
+    assert adapt_text("ümlaut".encode("utf-8")) == "ümlaut"
+    assert isinstance(adapt_text(["A"]), Json)
+    assert adapt_text(None) is None
+    assert adapt_text(5) == 5
 
-@patch("pgcopy.fdw_copy.adapt")
-def test_literal_falls_back_when_adapt_raises(mock_adapt):
-    mock_adapt.side_effect = Exception("boom")
 
-    out = _literal("O'Reilly")
-    assert out == "'O''Reilly'"
+def _fake_mogrify(template, values):
+    quoted = tuple(adapt(v).getquoted().decode("utf-8") for v in values)
+    return (template % quoted).encode("utf-8")
 
 
 def _make_conn_with_local_columns(local_cols):
     """
     Create a fake psycopg2-like connection whose cursor() context manager
-    returns a cursor with an execute() that serves information_schema.columns.
+    returns a cursor with an execute() that serves the local column lookup.
     """
     conn = MagicMock()
     cur = MagicMock()
 
     conn.cursor.return_value.__enter__.return_value = cur
+    cur.mogrify.side_effect = _fake_mogrify
 
     def execute_side_effect(query, params=None):
         text = str(query)
-        if "information_schema.columns" in text:
-            cur.fetchall.return_value = [(c,) for c in local_cols]
+        if "a.attname = ANY" in text:
+            cur.fetchall.return_value = [
+                (c,) for c in local_cols if c in params[2]
+            ]
 
     cur.execute.side_effect = execute_side_effect
     return conn
 
 
 @patch("pgcopy.fdw_copy._create_server_object")
-@patch("pgcopy.fdw_copy._get_local_rows")
+@patch("pgcopy.fdw_copy._iter_local_rows")
 @patch("pgcopy.fdw_copy._get_remote_cols_and_types")
 def test_copy_raises_if_no_overlapping_columns(
     mock_get_remote_cols,
-    mock_get_local_rows,
+    mock_iter_local_rows,
     mock_create_server_object,
 ):
     """
@@ -105,7 +108,7 @@ def test_copy_raises_if_no_overlapping_columns(
     conn = _make_conn_with_local_columns(local_cols=["local_only"])
 
     # No rows should be fetched when there is no overlap
-    mock_get_local_rows.return_value = []
+    mock_iter_local_rows.return_value = []
 
     with pytest.raises(ValueError, match="No overlapping columns"):
         copy_local_to_remote_via_dblink_values(
@@ -125,16 +128,16 @@ def test_copy_raises_if_no_overlapping_columns(
         )
 
     mock_create_server_object.assert_called_once()
-    mock_get_local_rows.assert_not_called()
+    mock_iter_local_rows.assert_not_called()
 
 
 @patch("pgcopy.fdw_copy.sql.Composed.as_string", return_value="INSERT DUMMY")
 @patch("pgcopy.fdw_copy._create_server_object")
-@patch("pgcopy.fdw_copy._get_local_rows")
+@patch("pgcopy.fdw_copy._iter_local_rows")
 @patch("pgcopy.fdw_copy._get_remote_cols_and_types")
 def test_copy_success_with_simple_overlap(
     mock_get_remote_cols,
-    mock_get_local_rows,
+    mock_iter_local_rows,
     mock_create_server_object,
     mock_as_string,
 ):
@@ -152,9 +155,8 @@ def test_copy_success_with_simple_overlap(
     # Local side has at least these columns
     conn = _make_conn_with_local_columns(local_cols=["id", "name", "ignore"])
 
-    mock_get_local_rows.return_value = [
-        (1, "Alice"),
-        (2, "Bob"),
+    mock_iter_local_rows.return_value = [
+        [(1, "Alice"), (2, "Bob")],
     ]
 
     result = copy_local_to_remote_via_dblink_values(
@@ -177,16 +179,16 @@ def test_copy_success_with_simple_overlap(
 
     mock_as_string.assert_called()
     mock_create_server_object.assert_called_once()
-    mock_get_local_rows.assert_called_once()
+    mock_iter_local_rows.assert_called_once()
 
 
 @patch("pgcopy.fdw_copy.sql.Composed.as_string", return_value="INSERT DUMMY")
 @patch("pgcopy.fdw_copy._create_server_object")
-@patch("pgcopy.fdw_copy._get_local_rows")
+@patch("pgcopy.fdw_copy._iter_local_rows")
 @patch("pgcopy.fdw_copy._get_remote_cols_and_types")
 def test_copy_returns_none_when_no_rows(
     mock_get_remote_cols,
-    mock_get_local_rows,
+    mock_iter_local_rows,
     mock_create_server_object,
     mock_as_string,
     caplog,
@@ -195,7 +197,7 @@ def test_copy_returns_none_when_no_rows(
 
     conn = _make_conn_with_local_columns(local_cols=["id"])
 
-    mock_get_local_rows.return_value = []
+    mock_iter_local_rows.return_value = []
 
     with caplog.at_level(logging.WARN):
         result = copy_local_to_remote_via_dblink_values(
@@ -220,11 +222,11 @@ def test_copy_returns_none_when_no_rows(
 
 @patch("pgcopy.fdw_copy.sql.Composed.as_string", return_value="INSERT DUMMY")
 @patch("pgcopy.fdw_copy._create_server_object")
-@patch("pgcopy.fdw_copy._get_local_rows")
+@patch("pgcopy.fdw_copy._iter_local_rows")
 @patch("pgcopy.fdw_copy._get_remote_cols_and_types")
 def test_copy_logs_and_rolls_back_on_dblink_error(
     mock_get_remote_cols,
-    mock_get_local_rows,
+    mock_iter_local_rows,
     mock_create_server_object,
     mock_as_string,
     caplog,
@@ -237,18 +239,19 @@ def test_copy_logs_and_rolls_back_on_dblink_error(
     conn = MagicMock()
     cur = MagicMock()
     conn.cursor.return_value.__enter__.return_value = cur
+    cur.mogrify.side_effect = _fake_mogrify
 
     def execute_side_effect(query, params=None):
         text = str(query)
-        if "information_schema.columns" in text:
+        if "a.attname = ANY" in text:
             cur.fetchall.return_value = [("id",)]
         elif "dblink_exec" in text:
             raise RuntimeError("dblink failure")
 
     cur.execute.side_effect = execute_side_effect
 
-    mock_get_local_rows.return_value = [
-        (None,),
+    mock_iter_local_rows.return_value = [
+        [(None,)],
     ]
 
     with caplog.at_level(logging.ERROR):
@@ -270,17 +273,22 @@ def test_copy_logs_and_rolls_back_on_dblink_error(
 
     assert result is False
     assert any("Chunk 1 failed" in r.message for r in caplog.records)
+    conn.rollback.assert_not_called()
+    cur.execute.assert_called_with("ROLLBACK TO SAVEPOINT pgcopy_chunk;")
+    executed = [str(c.args[0]) for c in cur.execute.call_args_list]
+    assert any("SAVEPOINT pgcopy_chunk" in q for q in executed)
+    assert not any(q in executed for q in ("BEGIN;", "COMMIT;", "ROLLBACK;"))
 
     mock_as_string.assert_called()
 
 
 @patch("pgcopy.fdw_copy.sql.Composed.as_string", return_value="INSERT DUMMY")
 @patch("pgcopy.fdw_copy._create_server_object")
-@patch("pgcopy.fdw_copy._get_local_rows")
+@patch("pgcopy.fdw_copy._iter_local_rows")
 @patch("pgcopy.fdw_copy._get_remote_cols_and_types")
 def test_copy_logs_chunk_insert_when_more_rows_than_batch(
     mock_get_remote_cols,
-    mock_get_local_rows,
+    mock_iter_local_rows,
     mock_create_server_object,
     mock_as_string,
     caplog,
@@ -291,9 +299,9 @@ def test_copy_logs_chunk_insert_when_more_rows_than_batch(
 
     conn = _make_conn_with_local_columns(local_cols=["id"])
 
-    mock_get_local_rows.return_value = [
-        (1,),
-        (2,),
+    mock_iter_local_rows.return_value = [
+        [(1,)],
+        [(2,)],
     ]
 
     with caplog.at_level(logging.INFO):
@@ -322,6 +330,60 @@ def test_copy_logs_chunk_insert_when_more_rows_than_batch(
     mock_as_string.assert_called()
 
 
+@patch("pgcopy.fdw_copy.sql.Composed.as_string", return_value="INSERT DUMMY")
+@patch("pgcopy.fdw_copy._create_server_object")
+@patch("pgcopy.fdw_copy._iter_local_rows")
+@patch("pgcopy.fdw_copy._get_remote_cols_and_types")
+def test_copy_renders_rows_with_mogrify(
+    mock_get_remote_cols,
+    mock_iter_local_rows,
+    mock_create_server_object,
+    mock_as_string,
+):
+    mock_get_remote_cols.return_value = [
+        ("id", "integer"),
+        ("tags", "text[]"),
+        ("doc", "jsonb"),
+    ]
+
+    conn = _make_conn_with_local_columns(local_cols=["id", "tags", "doc"])
+    cur = conn.cursor.return_value.__enter__.return_value
+
+    mock_iter_local_rows.return_value = [
+        [(1, ["A", None], {"a": 1}), (2, [b"B"], None)],
+    ]
+
+    result = copy_local_to_remote_via_dblink_values(
+        conn=conn,
+        local_schema="public",
+        local_table="local_table",
+        remote_host="remote-host",
+        remote_schema="public",
+        remote_table="remote_table",
+        remote_db="remote_db",
+        remote_password="pwd",
+    )
+
+    assert result is True
+    cur.mogrify.assert_called_once()
+    template = cur.mogrify.call_args.args[0]
+    assert template == (
+        "(%s::integer, %s::text[], %s::jsonb), "
+        "(%s::integer, %s::text[], %s::jsonb)"
+    )
+
+    statements = [
+        c.args[1][1]
+        for c in cur.execute.call_args_list
+        if "dblink_exec" in str(c.args[0])
+    ]
+    assert statements == [
+        "INSERT DUMMY"
+        "(1::integer, ARRAY['A',NULL]::text[], '{\"a\":1}'::jsonb), "
+        "(2::integer, ARRAY['B']::text[], NULL::jsonb);"
+    ]
+
+
 def _make_conn():
     conn = MagicMock()
     cur = MagicMock()
@@ -358,64 +420,230 @@ def test_get_remote_cols_and_types_raises_if_no_rows(
     mock_as_string.assert_called()
 
 
+def _serve_batches(cur, batches):
+    pending = iter(batches + [[]])
+    cur.fetchmany.side_effect = lambda size: next(pending)
+
+
 def test_get_local_rows_with_and_without_limit():
     conn, cur = _make_conn()
-    cur.fetchall.return_value = [(1, "Alice")]
 
+    _serve_batches(cur, [[(1, "Alice")]])
     rows = _get_local_rows(conn, "public", "tbl", ["id", "name"], limit=None)
     assert rows == [(1, "Alice")]
     assert cur.execute.call_count == 1
 
     cur.execute.reset_mock()
+    _serve_batches(cur, [[(1, "Alice")], [(2, "Bob")]])
     rows = _get_local_rows(conn, "public", "tbl", ["id"], limit=10)
-    assert rows == [(1, "Alice")]
+    assert rows == [(1, "Alice"), (2, "Bob")]
     assert "LIMIT" in str(cur.execute.call_args[0][0])
 
 
-def test_create_server_object_builds_server_and_user_mapping():
-    conn = MagicMock()
-    cur = MagicMock()
-    conn.cursor.return_value.__enter__.return_value = cur
+def test_iter_local_rows_yields_batches_from_server_side_cursor():
+    conn, cur = _make_conn()
+    _serve_batches(cur, [[(1,), (2,)], [(3,)]])
 
-    with patch("pgcopy.fdw_copy._drop_server_object") as mock_drop:
-        _create_server_object(
-            conn=conn,
-            remote_host="host",
-            remote_db="db",
-            remote_password="pwd",
-            remote_server="srv",
-            remote_user="user",
-            remote_port=5432,
-        )
+    batches = _iter_local_rows(
+        conn, "public", "tbl", ["id"], limit=None, batch_size=2
+    )
+    conn.cursor.assert_not_called()
 
-    cur.execute.assert_any_call("CREATE EXTENSION IF NOT EXISTS dblink;")
+    assert list(batches) == [[(1,), (2,)], [(3,)]]
+    cur.fetchmany.assert_called_with(2)
+    _, kwargs = conn.cursor.call_args
+    assert "withhold" not in kwargs
+    assert kwargs["name"].startswith("pgcopy_")
+    assert cur.itersize == 2
+    conn.commit.assert_not_called()
 
-    sql_texts = [str(call.args[0]) for call in cur.execute.call_args_list]
-    assert any("CREATE SERVER IF NOT EXISTS srv" in s for s in sql_texts)
 
-    assert any(
-        "CREATE USER MAPPING IF NOT EXISTS FOR CURRENT_USER" in s
-        for s in sql_texts
+def test_iter_local_rows_uses_unique_cursor_names():
+    conn, cur = _make_conn()
+    cur.fetchmany.return_value = []
+
+    list(_iter_local_rows(conn, "public", "tbl", ["id"], limit=None))
+    list(_iter_local_rows(conn, "public", "tbl", ["id"], limit=None))
+
+    names = [c.kwargs["name"] for c in conn.cursor.call_args_list]
+    assert len(set(names)) == 2
+
+
+def test_create_dblink_extension_commits():
+    conn, cur = _make_conn()
+
+    create_dblink_extension(conn)
+
+    cur.execute.assert_called_once_with(
+        "CREATE EXTENSION IF NOT EXISTS dblink;"
     )
+    conn.commit.assert_called_once()
 
-    assert any(
-        "SELECT srvname, srvoptions FROM pg_foreign_server" in s
-        for s in sql_texts
+
+def test_create_server_object_builds_server_and_user_mapping():
+    conn, cur = _make_conn()
+
+    _create_server_object(
+        conn=conn,
+        remote_host="host",
+        remote_db="db",
+        remote_password="pwd",
+        remote_server="srv",
+        remote_user="user",
+        remote_port=5432,
     )
 
-    mock_drop.assert_called_once_with(conn, "srv")
+    cur.execute.assert_called_once()
+    query, params = cur.execute.call_args.args
+    sql_text = str(query)
+    assert "CREATE EXTENSION IF NOT EXISTS dblink;" in sql_text
+    assert "DROP SERVER IF EXISTS" in sql_text
+    assert "CREATE SERVER" in sql_text
+    assert "CREATE USER MAPPING FOR CURRENT_USER" in sql_text
+    assert "Identifier('srv')" in sql_text
+    assert "pg_foreign_server" not in sql_text
+    assert params == ["host", "5432", "db", "user", "pwd"]
 
     conn.commit.assert_called_once()
 
 
-def test_drop_server_object_with_cascade_flag():
+@patch("pgcopy.fdw_copy.sql.Identifier.as_string", return_value='"srv"')
+def test_drop_server_object_with_cascade_flag(mock_as_string):
     conn, cur = _make_conn()
 
     _drop_server_object(conn, "srv", cascade=True)
 
-    cur.execute.assert_called_once()
-    # SQL enthält 'DROP SERVER IF EXISTS' und 'CASCADE'
-    sql_text = str(cur.execute.call_args[0][0])
-    assert "DROP SERVER IF EXISTS" in sql_text
-    assert "CASCADE" in sql_text
+    mock_as_string.assert_called_once_with(conn)
+    cur.execute.assert_called_once_with('DROP SERVER IF EXISTS "srv" CASCADE;')
     conn.commit.assert_called_once()
+
+
+@patch("pgcopy.fdw_copy.sql.Identifier.as_string", return_value='"srv"')
+def test_drop_server_object_without_cascade(mock_as_string):
+    conn, cur = _make_conn()
+
+    _drop_server_object(conn, "srv", cascade=False)
+
+    cur.execute.assert_called_once_with('DROP SERVER IF EXISTS "srv";')
+
+
+def _make_copy_conns(local_cols, remote_cols, payload, rowcount):
+    """
+    Create local and remote fake connections for the COPY path. The local
+    cursor writes payload on COPY ... TO STDOUT, the remote cursor records
+    what it reads on COPY ... FROM STDIN.
+    """
+    conn, cur = _make_conn()
+    cur.fetchall.return_value = [(c,) for c in local_cols]
+
+    def copy_out(query, file, size=None):
+        file.write(payload)
+        cur.rowcount = rowcount
+
+    cur.copy_expert.side_effect = copy_out
+
+    remote_conn, remote_cur = _make_conn()
+    remote_cur.fetchall.return_value = remote_cols
+    received = []
+
+    def copy_in(query, file, size=None):
+        received.append(file.read())
+        remote_cur.rowcount = rowcount
+
+    remote_cur.copy_expert.side_effect = copy_in
+    return conn, remote_conn, received
+
+
+def test_copy_via_copy_streams_rows_to_remote():
+    conn, remote_conn, received = _make_copy_conns(
+        local_cols=["id", "name", "ignore"],
+        remote_cols=[("id", "integer"), ("name", "text")],
+        payload=b"1\tAlice\n2\tBob\n",
+        rowcount=2,
+    )
+
+    result = copy_local_to_remote_via_copy(
+        conn=conn,
+        remote_conn=remote_conn,
+        local_schema="public",
+        local_table="local_table",
+        remote_schema="public",
+        remote_table="remote_table",
+        row_limit=10,
+    )
+
+    assert result is True
+    assert received == [b"1\tAlice\n2\tBob\n"]
+    remote_conn.commit.assert_called_once()
+
+
+def test_copy_via_copy_returns_false_when_no_rows(caplog):
+    conn, remote_conn, received = _make_copy_conns(
+        local_cols=["id"],
+        remote_cols=[("id", "integer")],
+        payload=b"",
+        rowcount=0,
+    )
+
+    with caplog.at_level(logging.WARN):
+        result = copy_local_to_remote_via_copy(
+            conn, remote_conn, "public", "t", "public", "t"
+        )
+
+    assert result is False
+    assert received == []
+    assert any("No rows to copy" in r.message for r in caplog.records)
+
+
+def test_copy_via_copy_rolls_back_remote_on_error(caplog):
+    conn, remote_conn, _ = _make_copy_conns(
+        local_cols=["id"],
+        remote_cols=[("id", "integer")],
+        payload=b"1\n",
+        rowcount=1,
+    )
+    remote_cur = remote_conn.cursor.return_value.__enter__.return_value
+    remote_cur.copy_expert.side_effect = RuntimeError("copy failure")
+
+    with caplog.at_level(logging.ERROR):
+        result = copy_local_to_remote_via_copy(
+            conn, remote_conn, "public", "t", "public", "t"
+        )
+
+    assert result is False
+    remote_conn.rollback.assert_called_once()
+    assert any("copy failure" in r.message for r in caplog.records)
+
+
+def test_copy_via_copy_raises_if_no_overlapping_columns():
+    conn, remote_conn, _ = _make_copy_conns(
+        local_cols=["local_only"],
+        remote_cols=[("remote_only", "text")],
+        payload=b"",
+        rowcount=0,
+    )
+
+    with pytest.raises(ValueError, match="No overlapping columns"):
+        copy_local_to_remote_via_copy(
+            conn, remote_conn, "public", "t", "public", "t"
+        )
+
+
+def test_get_local_col_names_filters_server_side():
+    conn, cur = _make_conn()
+    cur.fetchall.return_value = [("id",)]
+
+    cols = _get_local_col_names(conn, "public", "tbl", ("id", "name"))
+
+    assert cols == {"id"}
+    query, params = cur.execute.call_args.args
+    assert "information_schema" not in str(query)
+    assert params == ("public", "tbl", ["id", "name"])
+
+
+def test_get_cols_and_types_raises_if_no_rows():
+    conn, cur = _make_conn()
+    cur.fetchall.return_value = []
+
+    with pytest.raises(ValueError):
+        _get_cols_and_types(conn, "public", "tbl")
@@ -8,7 +8,7 @@ from pgcopy.main import start
 @patch("pgcopy.main.build_routing")
 @patch("pgcopy.main.create_pg_connection")
 @patch("pgcopy.main.get_secret")
-def test_start_wires_everything_and_closes(
+def test_start_passes_connection_factory_and_keeps_pool_open(
     mock_get_secret,
     mock_create_pg_conn,
     mock_build_routing,
@@ -33,6 +33,20 @@ def test_start_wires_everything_and_closes(
     start()
 
     mock_get_secret.assert_called_once()
+    mock_create_pg_conn.assert_not_called()
+
+    mock_build_routing.assert_called_once()
+    mock_process_all_routes.assert_called_once()
+    args, kwargs = mock_process_all_routes.call_args
+    assert kwargs == {
+        "local_schema": pgcopy.config.source_schema,
+        "routing": routing,
+        "connect_remote": None,
+        "max_workers": pgcopy.config.max_workers,
+    }
+
+    connect = args[0]
+    assert connect() is conn
 
     mock_create_pg_conn.assert_called_once()
     _, kwargs = mock_create_pg_conn.call_args
@@ -45,10 +59,34 @@ def test_start_wires_everything_and_closes(
     assert kwargs["db_name"] == "db"
     assert kwargs["db_password"] == "pwd"
 
-    mock_build_routing.assert_called_once()
-    mock_process_all_routes.assert_called_once_with(
-        conn, local_schema=pgcopy.config.source_schema, routing=routing
-    )
+    conn.close.assert_not_called()
+    ssh_client.close.assert_not_called()
+
+
+@patch("pgcopy.main.pgcopy.config.direct_copy", True)
+@patch("pgcopy.main.process_all_routes")
+@patch("pgcopy.main.build_routing")
+@patch("pgcopy.main.create_pg_connection")
+@patch("pgcopy.main.get_secret")
+def test_start_passes_remote_connect_for_direct_copy(
+    mock_get_secret,
+    mock_create_pg_conn,
+    mock_build_routing,
+    mock_process_all_routes,
+):
+    mock_get_secret.return_value = ("h", 22, "u", "pwd", "db", "KEY")
+    remote_conn = MagicMock()
+    mock_create_pg_conn.return_value = (remote_conn, MagicMock())
+
+    start()
 
-    conn.close.assert_called_once()
-    ssh_client.close.assert_called_once()
+    connect_remote = mock_process_all_routes.call_args.kwargs["connect_remote"]
+    assert connect_remote("target", 5433, "db_1", "secret") is remote_conn
+
+    _, kwargs = mock_create_pg_conn.call_args
+    assert kwargs["ssh_key"] == "KEY"
+    assert kwargs["remote_host"] == "target"
+    assert kwargs["remote_port"] == 5433
+    assert kwargs["db_name"] == "db_1"
+    assert kwargs["db_password"] == "secret"
+    assert kwargs["local_port"] == 0
@@ -2,6 +2,7 @@ from unittest.mock import patch
 
 import pgcopy.config
 from pgcopy.mapping import build_routing
+from pgcopy.routing import Route
 
 
 @patch("pgcopy.mapping.get_secret_list")
@@ -29,9 +30,13 @@ def test_build_routing_builds_expected_structure(
     assert len(routing) == 1
 
     value = next(iter(routing.values()))
-    assert value["db"] == f"{pgcopy.config.db_prefix}_2"
-    assert "example_table" in value["tables"]
-    assert "weather" in value["tables"]
+    assert isinstance(value, Route)
+    assert value.db == f"{pgcopy.config.db_prefix}_2"
+    assert value.password == "pwd"
+    assert value.port == 5432
+    assert value.schema == "public"
+    assert "example_table" in value.tables
+    assert "weather" in value.tables
 
     mock_get_list.assert_called_once()
     assert mock_format_secret.call_count >= 1
@@ -1,26 +1,33 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import FrozenInstanceError
 from unittest.mock import MagicMock, patch
 
+import psycopg2
+import pytest
 from pytest import raises
 
-from pgcopy.routing import _ensure_int, process_all_routes
+from pgcopy.routing import Route, _remote_server_name, process_all_routes
+
+
+@pytest.fixture(autouse=True)
+def mock_create_extension():
+    with patch("pgcopy.routing.create_dblink_extension") as mock:
+        yield mock
 
 
 def test_process_all_routes_calls_copy_for_each_table():
     conn = MagicMock()
 
     routing = {
-        "host1": {
-            "db": "db1",
-            "password": "pwd1",
-            "tables": ["t1", "t2"],
-        },
-        "host2": {
-            "db": "db2",
-            "password": "pwd2",
-            "tables": ["t3"],
-            "schema": "custom_schema",
-            "port": 5555,
-        },
+        "host1": Route(db="db1", password="pwd1", tables=("t1", "t2")),
+        "host2": Route(
+            db="db2",
+            password="pwd2",
+            tables=("t3",),
+            schema="custom_schema",
+            port=5555,
+        ),
     }
 
     with patch(
@@ -28,7 +35,7 @@ def test_process_all_routes_calls_copy_for_each_table():
         return_value=True,
     ) as mock_copy:
         process_all_routes(
-            conn,
+            lambda: conn,
             local_schema="pipeline",
             routing=routing,
             remote_server_prefix="pygrate_",
@@ -36,23 +43,20 @@ def test_process_all_routes_calls_copy_for_each_table():
 
     assert mock_copy.call_count == 3
 
-    first_call_kwargs = mock_copy.call_args_list[0].kwargs
-    assert first_call_kwargs["local_schema"] == "pipeline"
-    assert first_call_kwargs["remote_db"] == "db1"
-    assert first_call_kwargs["remote_host"] == "host1"
+    calls = {
+        c.kwargs["local_table"]: c.kwargs for c in mock_copy.call_args_list
+    }
+    assert calls["t1"]["local_schema"] == "pipeline"
+    assert calls["t1"]["remote_db"] == "db1"
+    assert calls["t1"]["remote_host"] == "host1"
+    assert calls["t3"]["remote_schema"] == "custom_schema"
+    assert calls["t3"]["remote_port"] == 5555
+    assert conn.close.call_count == 3
 
 
 def _minimal_routing():
     return {
-        "ExampleDatabase": {
-            "host": "h",
-            "port": 5432,
-            "user": "u",
-            "password": "p",
-            "db": "db",
-            "remote_server": "srv",
-            "tables": ["tbl1"],
-        }
+        "ExampleDatabase": Route(db="db", password="p", tables=("tbl1",)),
     }
 
 
@@ -61,28 +65,233 @@ def test_process_all_routes_success(mock_copy):
     mock_copy.return_value = True
     conn = MagicMock()
 
-    process_all_routes(conn, local_schema="public", routing=_minimal_routing())
+    process_all_routes(
+        lambda: conn, local_schema="public", routing=_minimal_routing()
+    )
 
     mock_copy.assert_called_once()
+    assert conn.close.call_count == 2
 
 
-@patch("pgcopy.routing.traceback.print_exc")
 @patch("pgcopy.routing.copy_local_to_remote_via_dblink_values")
-def test_process_all_routes_logs_error_on_exception(mock_copy, mock_print_exc):
+def test_process_all_routes_logs_error_on_exception(mock_copy, caplog):
     mock_copy.side_effect = RuntimeError("boom")
     conn = MagicMock()
 
-    process_all_routes(conn, local_schema="public", routing=_minimal_routing())
+    with caplog.at_level(logging.ERROR):
+        process_all_routes(
+            lambda: conn, local_schema="public", routing=_minimal_routing()
+        )
 
     mock_copy.assert_called_once()
-    mock_print_exc.assert_called_once()
+    assert conn.close.call_count == 2
+    (record,) = caplog.records
+    assert record.levelno == logging.ERROR
+    assert "Error copying tbl1 (RuntimeError): boom" in record.getMessage()
+    assert record.exc_info[0] is RuntimeError
+
+
+def test_process_all_routes_uses_one_connection_per_route():
+    connections = []
+
+    def connect():
+        conn = MagicMock()
+        connections.append(conn)
+        return conn
+
+    routing = {
+        "host1": Route(db="db1", password="p", tables=("t1", "t2")),
+        "host2": Route(db="db2", password="p", tables=("t3",)),
+    }
+
+    with patch(
+        "pgcopy.routing.copy_local_to_remote_via_dblink_values",
+        return_value=True,
+    ) as mock_copy:
+        process_all_routes(connect, local_schema="public", routing=routing)
+
+    # One connection creates the dblink extension, one per route copies
+    assert len(connections) == 3
+    used = {}
+    for c in mock_copy.call_args_list:
+        used.setdefault(c.kwargs["remote_host"], set()).add(c.kwargs["conn"])
+    assert all(len(conns) == 1 for conns in used.values())
+    assert used["host1"] != used["host2"]
+    for conn in connections:
+        conn.close.assert_called_once()
+
+
+def test_process_all_routes_copies_directly_with_remote_connect():
+    conn = MagicMock()
+    remote_conn = MagicMock()
+    connect_remote = MagicMock(return_value=remote_conn)
+
+    routing = {
+        "host1": Route(db="db1", password="pwd1", tables=("t1", "t2")),
+    }
+
+    with (
+        patch(
+            "pgcopy.routing.copy_local_to_remote_via_copy", return_value=True
+        ) as mock_copy,
+        patch(
+            "pgcopy.routing.copy_local_to_remote_via_dblink_values"
+        ) as mock_dblink,
+    ):
+        process_all_routes(
+            lambda: conn,
+            local_schema="public",
+            routing=routing,
+            connect_remote=connect_remote,
+        )
+
+    connect_remote.assert_called_once_with("host1", 5432, "db1", "pwd1")
+    assert mock_copy.call_count == 2
+    assert mock_copy.call_args.kwargs["remote_conn"] is remote_conn
+    mock_dblink.assert_not_called()
+    remote_conn.close.assert_called_once()
+    conn.close.assert_called_once()
+
+
+@patch(
+    "pgcopy.routing.copy_local_to_remote_via_dblink_values",
+    return_value=True,
+)
+def test_process_all_routes_caps_workers(mock_copy):
+    routing = {
+        f"host{i}": Route(db="db", password="p", tables=("t",))
+        for i in range(3)
+    }
+
+    with patch(
+        "pgcopy.routing.ThreadPoolExecutor", wraps=ThreadPoolExecutor
+    ) as spy:
+        process_all_routes(
+            MagicMock, local_schema="public", routing=routing, max_workers=1
+        )
+        spy.assert_called_once_with(max_workers=1)
+
+        spy.reset_mock()
+        process_all_routes(MagicMock, local_schema="public", routing=routing)
+        spy.assert_called_once_with(max_workers=3)
+
+    assert mock_copy.call_count == 6
+
+
+def test_process_all_routes_creates_dblink_extension_once(
+    mock_create_extension,
+):
+    conn = MagicMock()
+    routing = {
+        "host1": Route(db="db", password="p", tables=("t1",)),
+        "host2": Route(db="db", password="p", tables=("t2",)),
+    }
+
+    with patch(
+        "pgcopy.routing.copy_local_to_remote_via_dblink_values",
+        return_value=True,
+    ) as mock_copy:
+        process_all_routes(
+            lambda: conn, local_schema="public", routing=routing
+        )
+
+    mock_create_extension.assert_called_once_with(conn)
+    servers = {c.kwargs["remote_server"] for c in mock_copy.call_args_list}
+    assert len(servers) == 2
+
+
+def test_process_all_routes_skips_extension_for_direct_copy(
+    mock_create_extension,
+):
+    routing = {"host1": Route(db="db", password="p", tables=("t1",))}
+
+    with patch("pgcopy.routing.copy_local_to_remote_via_copy"):
+        process_all_routes(
+            MagicMock,
+            local_schema="public",
+            routing=routing,
+            connect_remote=MagicMock(),
+        )
+
+    mock_create_extension.assert_not_called()
+
+
+def test_remote_server_name_includes_sanitised_host():
+    assert (
+        _remote_server_name("pygrate_", "db-1", "Db-Host.example.com")
+        == "pygrate_db_1_db_host_example_com"
+    )
+
+
+def test_remote_server_name_stays_unique_within_identifier_limit():
+    first = _remote_server_name("pygrate_", "db", "a" * 80 + ".one")
+    second = _remote_server_name("pygrate_", "db", "a" * 80 + ".two")
+    assert len(first) == len(second) == 63
+    assert first != second
+
+
+def test_process_all_routes_logs_every_failed_route(caplog):
+    setup_conn = MagicMock()
+    calls = []
+
+    def connect():
+        calls.append(None)
+        if len(calls) == 1:
+            # Connection used to create the dblink extension
+            return setup_conn
+        raise psycopg2.OperationalError("tunnel down")
+
+    routing = {
+        "hostA": Route(db="db_a", password="p", tables=("t1",)),
+        "hostB": Route(db="db_b", password="p", tables=("t2",)),
+    }
+
+    with (
+        caplog.at_level(logging.ERROR),
+        patch(
+            "pgcopy.routing.copy_local_to_remote_via_dblink_values"
+        ) as mock_copy,
+    ):
+        process_all_routes(connect, local_schema="public", routing=routing)
+
+    mock_copy.assert_not_called()
+    messages = sorted(r.getMessage() for r in caplog.records)
+    assert messages == [
+        "❌ Route db_a@hostA failed (OperationalError): tunnel down",
+        "❌ Route db_b@hostB failed (OperationalError): tunnel down",
+    ]
+    assert all(r.exc_info for r in caplog.records)
+
+
+def test_process_all_routes_closes_connection_when_remote_connect_fails(
+    caplog,
+):
+    conn = MagicMock()
+    connect_remote = MagicMock(side_effect=RuntimeError("no route"))
+    routing = {"host1": Route(db="db1", password="p", tables=("t1",))}
+
+    with caplog.at_level(logging.ERROR):
+        process_all_routes(
+            lambda: conn,
+            local_schema="public",
+            routing=routing,
+            connect_remote=connect_remote,
+        )
+
+    conn.close.assert_called_once()
+    assert "Route db1@host1 failed (RuntimeError)" in caplog.text
+
+
+def test_process_all_routes_ignores_empty_routing():
+    connect = MagicMock()
+
+    process_all_routes(connect, local_schema="public", routing={})
 
+    connect.assert_not_called()
 
-def test_ensure_int_raises_on_str():
-    with raises(TypeError):
-        _ensure_int("abc")
 
+def test_route_is_immutable():
+    route = Route(db="db", password="p", tables=("t1",))
 
-def test_ensure_int_raises_on_list():
-    with raises(TypeError):
-        _ensure_int(["1", "2"])
+    with raises(FrozenInstanceError):
+        route.db = "other"  # type: ignore[misc]